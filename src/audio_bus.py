@@ -0,0 +1,144 @@
+import queue
+import threading
+from collections import deque, namedtuple
+
+import numpy as np
+
+DROP_OLDEST = 'drop_oldest'
+DROP_NEWEST = 'drop_newest'
+
+AudioLevel = namedtuple('AudioLevel', ['rms', 'peak'])
+
+
+def measure_level(audio_data):
+    """
+    RMS and peak of a block on a 0..1 scale, computed once and shared by every level consumer
+    - Integer PCM is accumulated in float64 without materializing a float copy
+    """
+    if audio_data.size == 0:
+        return AudioLevel(0.0, 0.0)
+    samples = audio_data.reshape(-1)
+    if np.issubdtype(samples.dtype, np.integer):
+        scale = 1.0 / -np.iinfo(samples.dtype).min
+        energy = np.einsum('i,i->', samples, samples, dtype=np.float64)
+        peak = max(int(samples.max()), -int(samples.min()))
+        return AudioLevel(float(np.sqrt(energy / samples.size)) * scale, peak * scale)
+    return AudioLevel(float(np.sqrt(np.mean(np.square(samples)))),
+                      float(np.max(np.abs(samples))))
+
+
+class Subscription:
+    """
+    Bounded consumer queue attached to an AudioBus
+    - Mirrors the queue.Queue get/get_nowait/qsize/empty interface
+    - When full, either the oldest queued item or the new item is dropped
+    """
+    def __init__(self, name, maxsize, policy=DROP_OLDEST, levels=False):
+        if policy not in (DROP_OLDEST, DROP_NEWEST):
+            raise ValueError(f"Unknown drop policy: {policy}")
+        self.name = name
+        self.maxsize = max(1, int(maxsize))
+        self.policy = policy
+        self.levels = levels
+        self.dropped = 0
+        self.dropped_frames = 0
+        self._items = deque()
+        self._not_empty = threading.Condition(threading.Lock())
+
+    def put(self, item):
+        with self._not_empty:
+            if len(self._items) >= self.maxsize:
+                self.dropped += 1
+                if self.policy == DROP_NEWEST:
+                    if not self.levels:
+                        self.dropped_frames += len(item)
+                    return False
+                dropped = self._items.popleft()
+                if not self.levels:
+                    self.dropped_frames += len(dropped)
+            self._items.append(item)
+            self._not_empty.notify()
+            return True
+
+    def get(self, timeout=None):
+        with self._not_empty:
+            if not self._items and not self._not_empty.wait_for(lambda: self._items, timeout):
+                raise queue.Empty
+            return self._items.popleft()
+
+    def get_nowait(self):
+        with self._not_empty:
+            if not self._items:
+                raise queue.Empty
+            return self._items.popleft()
+
+    def drain(self):
+        """Remove and return everything currently queued"""
+        with self._not_empty:
+            items = list(self._items)
+            self._items.clear()
+            return items
+
+    def queued_frames(self):
+        with self._not_empty:
+            return sum(len(item) for item in self._items)
+
+    def qsize(self):
+        return len(self._items)
+
+    def empty(self):
+        return not self._items
+
+
+class AudioBus:
+    """
+    Single-producer, multi-consumer fan-out for captured audio
+    - The producer (audio callback) never blocks
+    - Every subscriber gets its own bounded queue and drop policy
+    - Level subscribers receive precomputed AudioLevel values instead of raw blocks
+    """
+    def __init__(self):
+        self._audio_subscriptions = ()
+        self._level_subscriptions = ()
+        self._lock = threading.Lock()
+
+    def subscribe(self, name, maxsize=256, policy=DROP_OLDEST, levels=False):
+        subscription = Subscription(name, maxsize, policy, levels)
+        with self._lock:
+            # Tuples are swapped atomically so publish() can iterate without locking
+            if levels:
+                self._level_subscriptions += (subscription,)
+            else:
+                self._audio_subscriptions += (subscription,)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._audio_subscriptions = tuple(s for s in self._audio_subscriptions if s is not subscription)
+            self._level_subscriptions = tuple(s for s in self._level_subscriptions if s is not subscription)
+
+    def clear(self):
+        with self._lock:
+            self._audio_subscriptions = ()
+            self._level_subscriptions = ()
+
+    def subscriptions(self):
+        return self._audio_subscriptions + self._level_subscriptions
+
+    def publish(self, block, level=None):
+        """
+        Deliver a block to audio subscribers and its level to level subscribers
+        - Subscribers share the block, they must treat it as read-only
+        """
+        for subscription in self._audio_subscriptions:
+            subscription.put(block)
+        return self.publish_level(level, block)
+
+    def publish_level(self, level, block=None):
+        level_subscriptions = self._level_subscriptions
+        if level_subscriptions:
+            if level is None:
+                level = measure_level(block)
+            for subscription in level_subscriptions:
+                subscription.put(level)
+        return level
@@ -0,0 +1,33 @@
+import argparse
+import json
+import logging
+
+from batch_transcriber import BatchTranscriber
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Transcribe audio files offline')
+    parser.add_argument('inputs', nargs='+', help='Audio files or directories (WAV/FLAC/OGG)')
+    parser.add_argument('-o', '--output', default='transcripts.jsonl', help='JSONL output file')
+    parser.add_argument('-m', '--model', help='Vosk model directory (defaults to config model_path)')
+    parser.add_argument('-w', '--workers', type=int, help='Worker processes (defaults to CPU count)')
+    parser.add_argument('-c', '--config', default='./config/config.json', help='Configuration file')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s: %(message)s')
+
+    with open(args.config, 'r') as config_file:
+        config = json.load(config_file)
+
+    transcriber = BatchTranscriber(
+        args.model or config['model_path'],
+        sample_rate=config['sample_rate'],
+        workers=args.workers
+    )
+    summary = transcriber.transcribe_files(args.inputs, args.output)
+    print(f"{summary['files']} files ({summary['failed']} failed) in {summary['elapsed_seconds']:.1f}s: "
+          f"{summary['files_per_second']:.2f} files/s, real-time factor {summary['real_time_factor']:.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+import json
+import os
+import time
+import logging
+import multiprocessing
+
+import numpy as np
+import soundfile as sf
+
+from model_cache import get_model_cache
+from resampler import StreamingResampler
+
+AUDIO_EXTENSIONS = ('.wav', '.flac', '.ogg')
+
+# Per-process state, filled in by the pool initializer
+_worker_state = {}
+
+
+def find_audio_files(paths):
+    """Expand directories into the audio files they contain, sorted by path"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(os.path.join(root, name) for name in names
+                             if name.lower().endswith(AUDIO_EXTENSIONS))
+        else:
+            files.append(path)
+    return sorted(files)
+
+
+def _init_worker(model_path, sample_rate, block_frames):
+    # Each worker loads the model once and reuses it for every file
+    _worker_state['model_path'] = model_path
+    _worker_state['sample_rate'] = sample_rate
+    _worker_state['block_frames'] = block_frames
+    # An initializer that raises makes the pool respawn workers forever, report it per file instead
+    try:
+        get_model_cache().get_model(model_path)
+        _worker_state['load_error'] = None
+    except Exception as e:
+        _worker_state['load_error'] = f"Model loading failed ({model_path}): {e}"
+
+
+def _transcribe_file(path):
+    started = time.perf_counter()
+    sample_rate = _worker_state['sample_rate']
+    result = {'file': path, 'text': '', 'segments': [], 'duration': 0.0}
+
+    try:
+        if _worker_state['load_error']:
+            raise RuntimeError(_worker_state['load_error'])
+        recognizer = get_model_cache().create_recognizer(_worker_state['model_path'], sample_rate)
+        with sf.SoundFile(path) as audio_file:
+            # Per file, so archives with mixed rates all reach the model rate
+            resampler = StreamingResampler(audio_file.samplerate, sample_rate)
+            result['duration'] = audio_file.frames / audio_file.samplerate
+
+            for block in audio_file.blocks(blocksize=_worker_state['block_frames'],
+                                           dtype='float32', always_2d=True):
+                # Downmix to mono and convert to the 16-bit PCM Vosk expects
+                mono = block.mean(axis=1) if block.shape[1] > 1 else block[:, 0]
+                mono = resampler.process(mono)
+                pcm = (np.clip(mono, -1.0, 1.0) * 32767).astype(np.int16)
+                if recognizer.AcceptWaveform(pcm.tobytes()):
+                    _append_segment(result, recognizer.Result())
+            tail = resampler.flush(np.int16)
+            if len(tail):
+                recognizer.AcceptWaveform(tail.tobytes())
+
+        _append_segment(result, recognizer.FinalResult())
+        result['text'] = ' '.join(segment['text'] for segment in result['segments'])
+    except Exception as e:
+        result['error'] = str(e)
+
+    result['elapsed'] = time.perf_counter() - started
+    return result
+
+
+def _append_segment(result, raw_result):
+    segment = json.loads(raw_result)
+    if segment.get('text', '').strip():
+        result['segments'].append({'text': segment['text']})
+
+
+class BatchTranscriber:
+    """
+    Headless transcription of audio files
+    - Files are streamed in blocks and converted to the model sample rate
+    - Files are spread over a process pool, each worker loads the model once
+    - Results are written as JSONL, one line per file
+    """
+    def __init__(self, model_path, sample_rate=16000, workers=None, block_frames=8192):
+        self.logger = logging.getLogger(__name__)
+        self.model_path = model_path
+        self.sample_rate = sample_rate
+        self.workers = workers or os.cpu_count() or 1
+        self.block_frames = block_frames
+
+    def transcribe_files(self, paths, output_path):
+        files = find_audio_files(paths)
+        started = time.perf_counter()
+        audio_seconds = 0.0
+        failed = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        with open(output_path, 'w', encoding='utf-8') as output, multiprocessing.Pool(
+                processes=min(self.workers, max(1, len(files))),
+                initializer=_init_worker,
+                initargs=(self.model_path, self.sample_rate, self.block_frames)) as pool:
+            for result in pool.imap_unordered(_transcribe_file, files):
+                output.write(json.dumps(result, ensure_ascii=False) + '\n')
+                audio_seconds += result['duration']
+                if 'error' in result:
+                    failed += 1
+                    self.logger.error(f"Batch transcription error ({result['file']}): {result['error']}")
+
+        elapsed = time.perf_counter() - started
+        summary = {
+            'files': len(files),
+            'failed': failed,
+            'audio_seconds': audio_seconds,
+            'elapsed_seconds': elapsed,
+            'files_per_second': len(files) / elapsed if elapsed > 0 else 0.0,
+            'real_time_factor': elapsed / audio_seconds if audio_seconds > 0 else 0.0,
+        }
+        self.logger.info(f"Batch transcription finished: {summary}")
+        return summary
@@ -0,0 +1,237 @@
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import argparse
+import platform
+import threading
+import subprocess
+import multiprocessing
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+import fake_sounddevice
+
+# Replace the audio backend before the pipeline imports it
+fake_sounddevice.install()
+
+from speech_recognizer import SpeechRecognizer  # noqa: E402
+from transcription_results import PARTIAL, FINAL  # noqa: E402
+
+
+def deep_merge(base, override):
+    merged = dict(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = deep_merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def peak_rss_bytes():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS, kilobytes elsewhere
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL,
+                                       text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_isolated(config_path, mode, speed, fixture, model_name, variant_name, overrides):
+    """
+    One benchmark run in a freshly spawned process
+    - Peak RSS, CPU time and the model cache then belong to this configuration only
+    """
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(1) as pool:
+        return pool.apply(_run_configuration, (config_path, mode, speed, fixture, model_name,
+                                               variant_name, overrides))
+
+
+def _run_configuration(config_path, mode, speed, fixture, model_name, variant_name, overrides):
+    runner = BenchmarkRunner(config_path, mode=mode, speed=speed)
+    try:
+        return runner.run(fixture, model_name, variant_name, overrides)
+    finally:
+        runner.close()
+
+
+class BenchmarkRunner:
+    """
+    Replays WAV fixtures through SpeechRecognizer via the fake sounddevice input
+    - One run per (fixture, model, config variant), main() runs each in its own process
+    - Reports real-time factor, partial/final latency, CPU, peak RSS and queue lag
+    """
+    def __init__(self, config_path, mode='record', speed=1.0, lag_interval=0.05):
+        with open(config_path, 'r') as config_file:
+            self.base_config = json.load(config_file)
+        self.mode = mode
+        self.speed = speed
+        self.lag_interval = lag_interval
+        self.work_dir = tempfile.mkdtemp(prefix='stt_benchmark_')
+
+    def close(self):
+        """Remove the scratch recordings and transcript store"""
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def run(self, fixture, model_name, variant_name='default', overrides=None):
+        config = deep_merge(self.base_config, overrides or {})
+        # Recordings and transcripts go to a scratch directory, not the user's recordings/
+        config = deep_merge(config, {'recording': {'directory': self.work_dir},
+                                     'transcript_store': {'path': os.path.join(self.work_dir, 'transcripts.db')}})
+        config_path = os.path.join(self.work_dir, f"config_{variant_name}.json")
+        with open(config_path, 'w') as config_file:
+            json.dump(config, config_file)
+
+        recognizer = SpeechRecognizer(config_path)
+        fake_sounddevice.set_input_file(fixture, self.speed)
+
+        arrivals = []
+        subscription = recognizer.subscribe_results()
+
+        def collect():
+            for result in subscription:
+                arrivals.append((time.perf_counter(), result))
+
+        collector = threading.Thread(target=collect, daemon=True)
+        collector.start()
+
+        cpu_started = time.process_time()
+        if self.mode == 'continuous':
+            recognizer.start_continuous_transcription(0, model_name)
+        else:
+            recognizer.start_recording(0, model_name)
+        stream = recognizer.capture.stream
+
+        lag_samples = []
+        while not stream.finished.wait(self.lag_interval):
+            lag_samples.append(recognizer.decode_scheduler.lag_seconds())
+        decode_metrics = recognizer.get_decode_metrics()
+
+        if self.mode == 'continuous':
+            recognizer.stop_continuous_transcription()
+        else:
+            recognizer.stop_recording()
+        cpu_seconds = time.process_time() - cpu_started
+        subscription.close()
+        collector.join()
+
+        audio_seconds = stream.frames_delivered / stream.samplerate
+        scheduler = recognizer.decode_scheduler
+        metrics = recognizer.get_metrics()
+        # Continuous-mode finals are decoded on the segment pool, not by the scheduler
+        segment_decode_seconds = metrics.get('segment_decode_seconds_total', 0.0)
+        decode_seconds = scheduler.decode_seconds + segment_decode_seconds
+        return {
+            'fixture': fixture,
+            'model': model_name,
+            'variant': variant_name,
+            'grammar': config.get('grammar'),
+            'detected_language': recognizer.detected_language,
+            'mode': self.mode,
+            'audio_seconds': audio_seconds,
+            'real_time_factor': decode_seconds / audio_seconds if audio_seconds else None,
+            'live_real_time_factor': scheduler.decode_seconds / audio_seconds if audio_seconds else None,
+            'segment_decode_seconds': segment_decode_seconds,
+            'first_partial_latency': self.first_partial_latency(arrivals, stream),
+            'final_latency': self.final_latency(arrivals, stream),
+            'finals': sum(1 for _, result in arrivals if result.kind == FINAL),
+            'cpu_seconds_per_stream': cpu_seconds,
+            'cpu_per_audio_second': cpu_seconds / audio_seconds if audio_seconds else None,
+            'peak_rss_bytes': peak_rss_bytes(),
+            'max_queue_lag_seconds': max(lag_samples, default=0.0),
+            'mean_queue_lag_seconds': sum(lag_samples) / len(lag_samples) if lag_samples else 0.0,
+            'decoder': decode_metrics,
+            'metrics': metrics,
+        }
+
+    def first_partial_latency(self, arrivals, stream):
+        # Wall time from the start of the replay to the first non-empty partial
+        for arrived, result in arrivals:
+            if result.kind == PARTIAL and result.text:
+                return arrived - stream.started_at
+        return None
+
+    def final_latency(self, arrivals, stream):
+        """
+        Wall time from delivering the last word's audio to receiving its final result
+        - Word times only follow the capture clock when every sample is decoded (record mode)
+        - Meaningless for unpaced replays
+        """
+        if self.mode != 'record' or self.speed <= 0:
+            return None
+        latencies = [arrived - (stream.started_at + result.end / self.speed)
+                     for arrived, result in arrivals if result.kind == FINAL and result.end is not None]
+        if not latencies:
+            return None
+        return {'mean': sum(latencies) / len(latencies), 'max': max(latencies)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the capture/decode pipeline on WAV fixtures')
+    parser.add_argument('fixtures', nargs='+', help='WAV/FLAC files to replay as microphone input')
+    parser.add_argument('-m', '--model', action='append', help='Language model name (repeatable)')
+    parser.add_argument('--variant', action='append', default=[],
+                        help='Config override as NAME=JSON, e.g. small_batch={"decoder":{"max_batch_ms":50}}')
+    parser.add_argument('--compare-grammars', action='store_true',
+                        help='Add a variant per grammar in the config, against open vocabulary')
+    parser.add_argument('--mode', choices=['record', 'continuous'], default='record')
+    parser.add_argument('--speed', type=float, default=1.0, help='Replay speed, 0 replays unpaced')
+    parser.add_argument('-c', '--config', default='./config/config.json', help='Base configuration file')
+    parser.add_argument('-o', '--output', help='JSON results file')
+    args = parser.parse_args()
+
+    variants = [('default', {})]
+    for variant in args.variant:
+        name, _, overrides = variant.partition('=')
+        variants.append((name, json.loads(overrides)))
+    if args.compare_grammars:
+        with open(args.config, 'r') as config_file:
+            grammars = json.load(config_file).get('grammars', {})
+        variants.extend((f"grammar_{name}", {'grammar': name}) for name in grammars)
+
+    models = args.model or [None]
+    results = []
+    for fixture in args.fixtures:
+        for model_name in models:
+            for variant_name, overrides in variants:
+                result = run_isolated(args.config, args.mode, args.speed, fixture, model_name,
+                                      variant_name, overrides)
+                results.append(result)
+                print(f"{os.path.basename(fixture)} {model_name or 'default'} {variant_name}: "
+                      f"RTF {result['real_time_factor'] or 0.0:.3f}, "
+                      f"CPU/audio s {result['cpu_per_audio_second'] or 0.0:.3f}, "
+                      f"max lag {result['max_queue_lag_seconds']:.3f}s")
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output = args.output or os.path.join('benchmark_results', f"benchmark_{timestamp}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as output_file:
+        json.dump({
+            'timestamp': timestamp,
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'cpu_count': os.cpu_count(),
+            'speed': args.speed,
+            'results': results,
+        }, output_file, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+import time
+import logging
+
+from metrics import MetricsRegistry
+from resampler import StreamingResampler
+
+# Vosk consumes 16-bit PCM, capturing in that format avoids any conversion before decoding
+CAPTURE_DTYPE = 'int16'
+
+
+class CapturePipeline:
+    """
+    Audio input stage feeding the capture buffer and the audio bus
+    - Opens the device as int16 with a fixed block size (chunk_size)
+    - The callback does one copy into the ring buffer and publishes the view
+    - Float data is only derived downstream, where the meter/VAD need it
+    - With device_rate set, the device runs at its native rate and a streaming resampler
+      converts to sample_rate before the ring buffer, so every consumer sees the model rate
+    """
+    def __init__(self, capture_buffer, audio_bus, sample_rate, channels, blocksize, device=None, metrics=None,
+                 device_rate=None):
+        self.logger = logging.getLogger(__name__)
+        self.capture_buffer = capture_buffer
+        self.audio_bus = audio_bus
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.blocksize = blocksize
+        self.device = device
+        self.device_rate = int(device_rate or sample_rate)
+        self.resampler = None
+        if self.device_rate != sample_rate:
+            self.resampler = StreamingResampler(self.device_rate, sample_rate, channels)
+            # Same block duration at the device rate
+            self.blocksize = max(1, round(blocksize * self.device_rate / sample_rate))
+        self.stream = None
+
+        metrics = metrics or MetricsRegistry()
+        self.callback_seconds = metrics.histogram('callback_seconds', 'Audio callback duration')
+        self.status_events = metrics.counter('callback_status_total', 'Callbacks reporting a stream status')
+        self.overflows = metrics.counter('input_overflows_total', 'Input overflow status events')
+        self.frames_captured = metrics.counter('frames_captured_total', 'Frames delivered by the device')
+
+    def callback(self, indata, frames, time_info, status):
+        started = time.perf_counter()
+        if status:
+            self.status_events.inc()
+            if getattr(status, 'input_overflow', False):
+                self.overflows.inc()
+            self.logger.warning(status)
+
+        if self.resampler is not None:
+            indata = self.resampler.process(indata)
+        # Single copy into the capture buffer, consumers share the view
+        if len(indata):
+            self.audio_bus.publish(self.capture_buffer.write(indata))
+        self.frames_captured.inc(frames)
+        self.callback_seconds.observe(time.perf_counter() - started)
+
+    def start(self):
+        # PortAudio is only loaded once capture actually starts
+        import sounddevice as sd
+        self.stream = sd.InputStream(
+            samplerate=self.device_rate,
+            channels=self.channels,
+            dtype=CAPTURE_DTYPE,
+            blocksize=self.blocksize,
+            callback=self.callback,
+            device=self.device
+        )
+        self.stream.start()
+        if self.resampler is not None:
+            self.logger.info(f"Capturing at {self.device_rate} Hz, resampling to {self.sample_rate} Hz")
+
+    def stop(self):
+        if self.stream is not None:
+            self.stream.stop()
+            self.stream.close()
+            self.stream = None
+            if self.resampler is not None:
+                # The last few milliseconds are still inside the filter
+                tail = self.resampler.flush(CAPTURE_DTYPE)
+                if len(tail):
+                    self.audio_bus.publish(self.capture_buffer.write(tail))
@@ -0,0 +1,152 @@
+import queue
+import threading
+import time
+import logging
+
+import numpy as np
+
+from vad import SPEECH_START, SPEECH_AUDIO, SPEECH_END
+
+
+class DecodeScheduler:
+    """
+    Event-driven decode loop between the audio bus and the recognizer
+    - Blocks on the subscription instead of polling
+    - Drains every pending block and decodes them in one call, up to max_batch_ms
+    - With a VAD, only speech is decoded and segments close on end-of-utterance
+    - Tracks queue depth and lag so callers can see whether decoding keeps up
+    - With channel set, decodes one column of interleaved blocks (a strided view, no copy)
+    """
+    def __init__(self, subscription, decode, sample_rate, channels=1, dtype='int16', vad=None,
+                 on_segment_start=None, on_segment_end=None, max_batch_ms=200, channel=None):
+        self.logger = logging.getLogger(__name__)
+        self.subscription = subscription
+        self.decode = decode
+        self.sample_rate = sample_rate
+        self.vad = vad
+        self.on_segment_start = on_segment_start
+        self.on_segment_end = on_segment_end
+        self.max_batch_frames = max(1, int(sample_rate * max_batch_ms / 1000))
+        self.channel = channel
+        if channel is not None:
+            channels = 1
+
+        # Reused for every batch
+        self._batch = np.empty((self.max_batch_frames, channels), dtype=dtype)
+        self._segment_start = None
+        self._running = False
+        self._thread = None
+
+        self.frames_decoded = 0
+        self.batches = 0
+        self.decode_seconds = 0.0
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='decode-scheduler')
+        self._thread.start()
+
+    def stop(self):
+        """Stop after decoding everything still queued and closing an open segment"""
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while self._running:
+            try:
+                # The timeout only bounds how long stop() waits, not decode latency
+                first = self.subscription.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            try:
+                self._process(self._collect(first))
+            except Exception as e:
+                self.logger.error(f"Decode error: {e}")
+
+        try:
+            while not self.subscription.empty():
+                self._process(self._collect(self.subscription.get_nowait()))
+            if self.vad is not None:
+                self._handle_events(self.vad.flush())
+        except Exception as e:
+            self.logger.error(f"Decode error: {e}")
+
+    def _select(self, block):
+        if self.channel is None:
+            return block
+        return block[:, self.channel:self.channel + 1]
+
+    def _collect(self, first):
+        # Take everything already waiting, up to one batch worth of frames
+        self.queue_depth = self.subscription.qsize() + 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        first = self._select(first)
+        blocks = [first]
+        frames = len(first)
+        while frames < self.max_batch_frames:
+            try:
+                block = self._select(self.subscription.get_nowait())
+            except queue.Empty:
+                break
+            blocks.append(block)
+            frames += len(block)
+        if len(blocks) == 1:
+            return first
+
+        # The last block may overshoot the batch size, grow once to fit it
+        if frames > len(self._batch):
+            self._batch = np.empty((frames, self._batch.shape[1]), dtype=self._batch.dtype)
+        position = 0
+        for block in blocks:
+            self._batch[position:position + len(block)] = block
+            position += len(block)
+        return self._batch[:position]
+
+    def _process(self, batch):
+        started = time.perf_counter()
+        if self.vad is None:
+            self.decode(batch)
+        else:
+            self._handle_events(self.vad.process(batch))
+        self.decode_seconds += time.perf_counter() - started
+        self.frames_decoded += len(batch)
+        self.batches += 1
+
+    def _handle_events(self, events):
+        # Consecutive speech audio is decoded in one call, segment ends flush it first
+        speech = []
+        for event in events:
+            if event.kind == SPEECH_AUDIO:
+                speech.append(event.audio)
+                continue
+            if speech:
+                self.decode(np.concatenate(speech) if len(speech) > 1 else speech[0])
+                speech = []
+            if event.kind == SPEECH_START:
+                self._segment_start = event.sample
+                if self.on_segment_start:
+                    self.on_segment_start(event.sample)
+            elif event.kind == SPEECH_END and self.on_segment_end:
+                self.on_segment_end(self._segment_start, event.sample)
+        if speech:
+            self.decode(np.concatenate(speech) if len(speech) > 1 else speech[0])
+
+    def lag_seconds(self):
+        # Captured audio still waiting for the decoder
+        return self.subscription.queued_frames() / self.sample_rate
+
+    def metrics(self):
+        audio_seconds = self.frames_decoded / self.sample_rate
+        return {
+            'queue_depth': self.subscription.qsize(),
+            'max_queue_depth': self.max_queue_depth,
+            'lag_seconds': self.lag_seconds(),
+            'batches': self.batches,
+            'frames_per_batch': self.frames_decoded / self.batches if self.batches else 0.0,
+            'dropped_blocks': self.subscription.dropped,
+            'real_time_factor': self.decode_seconds / audio_seconds if audio_seconds else 0.0,
+        }
@@ -0,0 +1,108 @@
+"""
+Stand-in for the sounddevice module that replays audio files as a live input
+- Used by the benchmark harness, install it with install() before importing the pipeline
+- Blocks are delivered from a thread at real time (speed=1.0), faster, or unpaced (speed=0)
+"""
+import sys
+import time
+import threading
+
+import numpy as np
+import soundfile as sf
+
+from resampler import StreamingResampler
+
+_input_file = None
+_speed = 1.0
+
+
+def install():
+    """Register this module as `sounddevice` so the capture pipeline picks it up"""
+    sys.modules['sounddevice'] = sys.modules[__name__]
+
+
+def set_input_file(path, speed=1.0):
+    global _input_file, _speed
+    _input_file = path
+    _speed = speed
+
+
+def query_devices(device=None, kind=None):
+    # The replayed file's rate stands in for the device's native rate
+    samplerate = float(sf.info(_input_file).samplerate) if _input_file else 16000.0
+    info = {'name': 'Fake input (file replay)', 'max_input_channels': 2, 'default_samplerate': samplerate}
+    if device is not None or kind is not None:
+        return info
+    return [info]
+
+
+class CallbackFlags:
+    input_overflow = False
+
+    def __bool__(self):
+        return False
+
+
+class InputStream:
+    def __init__(self, samplerate=None, channels=1, dtype='float32', blocksize=0, callback=None, device=None):
+        self.samplerate = samplerate
+        self.channels = channels
+        self.dtype = dtype
+        self.blocksize = blocksize or 1024
+        self.callback = callback
+        self.path = _input_file
+        self.speed = _speed
+        self.finished = threading.Event()
+        self.frames_delivered = 0
+        self.started_at = None
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._replay, name='fake-input', daemon=True)
+        self._thread.start()
+
+    def _blocks(self):
+        with sf.SoundFile(self.path) as audio_file:
+            resampler = StreamingResampler(audio_file.samplerate, self.samplerate, self.channels)
+            pending = np.empty((0, self.channels), dtype=np.float32)
+            for block in audio_file.blocks(blocksize=self.blocksize, dtype='float32', always_2d=True):
+                # Match the requested channel count, then the requested rate
+                block = block[:, :self.channels] if block.shape[1] >= self.channels else \
+                    np.repeat(block[:, :1], self.channels, axis=1)
+                block = resampler.process(np.ascontiguousarray(block))
+                pending = np.concatenate((pending, block))
+                while len(pending) >= self.blocksize:
+                    yield pending[:self.blocksize]
+                    pending = pending[self.blocksize:]
+            if len(pending):
+                yield np.concatenate((pending, np.zeros((self.blocksize - len(pending), self.channels),
+                                                        dtype=np.float32)))
+
+    def _replay(self):
+        self.started_at = time.perf_counter()
+        for block in self._blocks():
+            if not self._running:
+                break
+            if np.dtype(self.dtype) == np.int16:
+                block = (np.clip(block, -1.0, 1.0) * 32767).astype(np.int16)
+            else:
+                block = block.astype(self.dtype)
+            if self.speed > 0:
+                # Deliver each block no earlier than a real device would
+                due = self.started_at + (self.frames_delivered + len(block)) / self.samplerate / self.speed
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            self.callback(block, len(block), None, CallbackFlags())
+            self.frames_delivered += len(block)
+        self.finished.set()
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+
+    def close(self):
+        pass
@@ -0,0 +1,97 @@
+import os
+import json
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+def score_results(parts):
+    """(mean word confidence, word count) over Result()/FinalResult() dicts, [unk] excluded"""
+    words = [word for part in parts for word in part.get('result', []) if word.get('word') != '[unk]']
+    if not words:
+        return 0.0, 0
+    return sum(word.get('conf', 0.0) for word in words) / len(words), len(words)
+
+
+class LanguageRace:
+    """
+    Picks a language by decoding the first seconds of speech with every candidate model at once
+    - candidates maps a language name to its model path, recognizers share the model cache
+    - Blocks are fed to all candidates in parallel on a thread pool, the raced audio is kept
+    - After `seconds` of audio the candidates are finalized and scored by mean word confidence,
+      more recognized words breaks ties; the losers are dropped
+    - Candidate models are pinned in the cache until release(), so none is evicted and reloaded
+      before the winner has its recognizer
+    - The winner decodes the kept audio from the start, so nothing is lost or captured twice
+    """
+    def __init__(self, model_cache, candidates, sample_rate, seconds=3.0, workers=None):
+        self.logger = logging.getLogger(__name__)
+        self.sample_rate = sample_rate
+        self.target_frames = int(seconds * sample_rate)
+        self.model_cache = model_cache
+        self.pinned = []
+        self.recognizers = {}
+        try:
+            for name, model_path in candidates.items():
+                model_cache.pin(model_path)
+                self.pinned.append(model_path)
+                recognizer = model_cache.create_recognizer(model_path, sample_rate)
+                recognizer.SetWords(True)
+                self.recognizers[name] = recognizer
+        except Exception:
+            self.release()
+            raise
+        self.results = {name: [] for name in self.recognizers}
+        self.scores = {}
+        self.executor = ThreadPoolExecutor(max_workers=workers or min(len(self.recognizers), os.cpu_count() or 1),
+                                           thread_name_prefix='language-race')
+        self.blocks = []
+        self.frames = 0
+        # Set by the first feed(), silence before the first speech is not part of the race
+        self.started_at = None
+        self.decided_at = None
+
+    def feed(self, data):
+        """Decode one block with every candidate, True once enough audio has been raced"""
+        if self.started_at is None:
+            self.started_at = time.perf_counter()
+        self.blocks.append(np.array(data, copy=True))
+        self._run(lambda name, recognizer: self._accept(name, recognizer, data))
+        self.frames += len(data)
+        return self.frames >= self.target_frames
+
+    def _accept(self, name, recognizer, data):
+        if recognizer.AcceptWaveform(data.tobytes()):
+            self.results[name].append(json.loads(recognizer.Result()))
+
+    def _run(self, call):
+        futures = [self.executor.submit(call, name, recognizer) for name, recognizer in self.recognizers.items()]
+        for future in futures:
+            try:
+                future.result()
+            except Exception as e:
+                self.logger.error(f"Language race decode error: {e}")
+
+    def finish(self):
+        """Score the candidates and drop them, returns (winner name, raced audio or None)"""
+        self._run(lambda name, recognizer: self.results[name].append(json.loads(recognizer.FinalResult())))
+        self.executor.shutdown(wait=True)
+        self.scores = {name: score_results(parts) for name, parts in self.results.items()}
+        winner = max(self.scores, key=lambda name: self.scores[name])
+        self.recognizers.clear()
+        self.decided_at = time.perf_counter()
+        if self.started_at is None:
+            self.started_at = self.decided_at
+        self.logger.info(f"Language detected: {winner} after {self.frames / self.sample_rate:.1f}s of audio "
+                         f"(scores {self.scores})")
+        audio = np.concatenate(self.blocks) if self.blocks else None
+        self.blocks = []
+        return winner, audio
+
+    def release(self):
+        """Unpin the candidate models, call once the winner's recognizer exists"""
+        for model_path in self.pinned:
+            self.model_cache.unpin(model_path)
+        self.pinned = []
@@ -1,4 +1,7 @@
-from ui_manager import main  
+import time
+started = time.perf_counter()
+
+from ui_manager import main  # noqa: E402
 
 if __name__ == '__main__':  
-    main()
\ No newline at end of file
+    main(started)
\ No newline at end of file
@@ -0,0 +1,235 @@
+import os
+import json
+import threading
+import logging
+from collections import OrderedDict
+
+
+def grammar_key(grammar):
+    """Canonical JSON phrase list as Vosk expects it, None for open vocabulary"""
+    if grammar is None:
+        return None
+    return grammar if isinstance(grammar, str) else json.dumps(list(grammar), ensure_ascii=False)
+
+
+class CachedRecognizer:
+    """
+    A recognizer checked out of the cache
+    - frames counts all audio it has consumed, Vosk word times keep counting across Reset()
+    - offset is the clock at checkout, subtract it to get times relative to this use
+    """
+    def __init__(self, key, recognizer, sample_rate, frames=0):
+        self.key = key
+        self.recognizer = recognizer
+        self.sample_rate = sample_rate
+        self.frames = frames
+        self.start_frames = frames
+
+    @property
+    def offset(self):
+        return self.start_frames / self.sample_rate
+
+
+class ModelCache:
+    """
+    Process-wide registry of loaded Vosk models
+    - Models are keyed by their absolute path and loaded at most once
+    - Least recently used models are evicted past the count/memory budget, pinned models are skipped
+    - Recognizers are created on top of the shared models
+    - Grammar recognizers are kept per (model, rate, grammar) and reused, compiling
+      the phrase list into a decoding graph is the expensive part of creating them
+    """
+    def __init__(self, max_models=2, memory_budget_mb=None, max_idle_recognizers=4):
+        self.logger = logging.getLogger(__name__)
+        self.max_models = max(1, int(max_models))
+        self.memory_budget = int(memory_budget_mb * 1024 * 1024) if memory_budget_mb else None
+
+        # path -> (model, estimated size in bytes), oldest first
+        self._models = OrderedDict()
+        # path -> Event set once a concurrent load finishes
+        self._loading = {}
+        # (path, rate, grammar) -> idle CachedRecognizers
+        self._idle = {}
+        self.max_idle_recognizers = max_idle_recognizers
+        # path -> pin count, pinned models are never evicted
+        self._pinned = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(model_path):
+        return os.path.abspath(model_path)
+
+    @staticmethod
+    def estimate_model_size(model_path):
+        # On-disk size is a close upper bound of the resident size for Vosk models
+        total = 0
+        for root, _, files in os.walk(model_path):
+            for name in files:
+                try:
+                    total += os.path.getsize(os.path.join(root, name))
+                except OSError:
+                    continue
+        return total
+
+    def get_model(self, model_path):
+        key = self._key(model_path)
+        while True:
+            with self._lock:
+                if key in self._models:
+                    self._models.move_to_end(key)
+                    return self._models[key][0]
+                pending = self._loading.get(key)
+                if pending is None:
+                    pending = threading.Event()
+                    self._loading[key] = pending
+                    break
+            # Another thread is loading the same model, wait and re-check
+            pending.wait()
+
+        try:
+            # Imported on first load, the native library is slow to initialize
+            import vosk
+            model = vosk.Model(model_path)
+            size = self.estimate_model_size(model_path)
+            self.logger.info(f"Loaded model from {model_path} ({size / 1e6:.1f} MB)")
+            with self._lock:
+                self._models[key] = (model, size)
+                self._evict_locked(keep=key)
+            return model
+        finally:
+            with self._lock:
+                self._loading.pop(key, None)
+            pending.set()
+
+    def _evict_locked(self, keep):
+        while len(self._models) > 1:
+            over_count = len(self._models) > self.max_models
+            over_budget = self.memory_budget is not None and self.memory_usage_locked() > self.memory_budget
+            if not (over_count or over_budget):
+                break
+            # Oldest first, never the model just loaded or a pinned one
+            evictable = [key for key in self._models if key != keep and key not in self._pinned]
+            if not evictable:
+                break
+            oldest = evictable[0]
+            self._models.pop(oldest)
+            self._drop_idle_locked(oldest)
+            self.logger.info(f"Evicted model {oldest}")
+
+    def pin(self, model_path):
+        """Keep a model loaded until the matching unpin(), the cache may exceed its budget meanwhile"""
+        key = self._key(model_path)
+        with self._lock:
+            self._pinned[key] = self._pinned.get(key, 0) + 1
+
+    def unpin(self, model_path):
+        key = self._key(model_path)
+        with self._lock:
+            count = self._pinned.get(key, 0) - 1
+            if count > 0:
+                self._pinned[key] = count
+            else:
+                self._pinned.pop(key, None)
+            # Evictions held back by the pin happen now
+            self._evict_locked(keep=None)
+
+    def memory_usage_locked(self):
+        return sum(size for _, size in self._models.values())
+
+    def memory_usage(self):
+        with self._lock:
+            return self.memory_usage_locked()
+
+    def create_recognizer(self, model_path, sample_rate, grammar=None):
+        import vosk
+        if grammar is None:
+            return vosk.KaldiRecognizer(self.get_model(model_path), sample_rate)
+        return vosk.KaldiRecognizer(self.get_model(model_path), sample_rate, grammar_key(grammar))
+
+    def checkout_recognizer(self, model_path, sample_rate, grammar=None):
+        """
+        Recognizer for exclusive use until checkin()
+        - Grammar recognizers come from the idle pool when one is available
+        - Open-vocabulary recognizers are cheap and always fresh
+        """
+        key = (self._key(model_path), sample_rate, grammar_key(grammar))
+        if grammar is not None:
+            with self._lock:
+                idle = self._idle.get(key)
+                if idle:
+                    cached = idle.pop()
+                    cached.start_frames = cached.frames
+                    return cached
+        return CachedRecognizer(key, self.create_recognizer(model_path, sample_rate, grammar), sample_rate)
+
+    def checkin(self, cached):
+        """Return a checked out recognizer, only grammar recognizers are kept"""
+        if cached.key[2] is None:
+            return
+        cached.recognizer.Reset()
+        with self._lock:
+            if cached.key[0] not in self._models:
+                return
+            idle = self._idle.setdefault(cached.key, [])
+            if len(idle) < self.max_idle_recognizers:
+                idle.append(cached)
+
+    def _drop_idle_locked(self, model_key):
+        for key in [key for key in self._idle if key[0] == model_key]:
+            del self._idle[key]
+
+    def idle_recognizers(self):
+        with self._lock:
+            return {key: len(idle) for key, idle in self._idle.items()}
+
+    def is_loaded(self, model_path):
+        with self._lock:
+            return self._key(model_path) in self._models
+
+    def loaded_models(self):
+        with self._lock:
+            return list(self._models.keys())
+
+    def evict(self, model_path):
+        with self._lock:
+            self._drop_idle_locked(self._key(model_path))
+            return self._models.pop(self._key(model_path), None) is not None
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+            self._idle.clear()
+
+    def preload(self, model_paths, background=True):
+        """
+        Load models ahead of time
+        - Runs on a daemon thread unless background is False
+        - Failures are logged and do not stop the remaining loads
+        """
+        def load_all():
+            for model_path in model_paths:
+                try:
+                    self.get_model(model_path)
+                except Exception as e:
+                    self.logger.error(f"Model preload error ({model_path}): {e}")
+
+        if not background:
+            load_all()
+            return None
+
+        thread = threading.Thread(target=load_all, name='model-preload', daemon=True)
+        thread.start()
+        return thread
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_model_cache(max_models=2, memory_budget_mb=None):
+    """Return the process-wide model cache, creating it on first use"""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = ModelCache(max_models, memory_budget_mb)
+        return _shared_cache
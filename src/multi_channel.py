@@ -0,0 +1,191 @@
+import os
+import time
+import queue
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from audio_bus import AudioBus, DROP_OLDEST
+from ring_buffer import AudioRingBuffer, max_view_blocks
+from decode_scheduler import DecodeScheduler
+from capture_pipeline import CapturePipeline, CAPTURE_DTYPE
+from transcription_results import ResultStream, ResultEmitter, put_latest
+
+
+class ChannelStream:
+    """Recognizer and results for one input channel, decoded by one pool thread at a time"""
+    def __init__(self, name, recognizer, min_partial_interval, text_queue_size=1000):
+        self.name = name
+        self.recognizer = recognizer
+        self.recognizer.SetWords(True)
+        self.results = ResultStream()
+        self.emitter = ResultEmitter(self.results, min_partial_interval)
+        self.text_queue = queue.Queue(maxsize=text_queue_size)
+        self.scheduler = None
+
+    def decode(self, data):
+        if self.recognizer.AcceptWaveform(data.tobytes()):
+            self.publish_final(self.recognizer.Result())
+        else:
+            self.emitter.partial(self.recognizer)
+
+    def finish(self):
+        return self.publish_final(self.recognizer.FinalResult())
+
+    def publish_final(self, raw_result):
+        final = self.emitter.final(raw_result)
+        if final is not None:
+            put_latest(self.text_queue, final.text)
+        return final
+
+
+class DeviceInput:
+    """One opened input device: capture buffer, bus and capture pipeline shared by its channels"""
+    def __init__(self, name, device, channels, sample_rate, blocksize, buffer_seconds, device_rate=None):
+        self.name = name
+        self.device = device
+        self.channels = channels
+        self.capture_buffer = AudioRingBuffer(
+            int(buffer_seconds * sample_rate),
+            channels=channels,
+            dtype=CAPTURE_DTYPE,
+            spill_to_disk=False
+        )
+        self.audio_bus = AudioBus()
+        self.capture = CapturePipeline(self.capture_buffer, self.audio_bus, sample_rate,
+                                       channels, blocksize, device=device, device_rate=device_rate)
+
+
+class MultiChannelSession:
+    """
+    Concurrent transcription of several inputs and/or every channel of a multichannel input
+    - inputs is a list of {"device": index, "channels": n, "name": optional label}
+    - Each device is captured once, each channel decodes a column view of the shared blocks
+    - One recognizer per channel, decode calls run on a thread pool sized to the cores
+    - Every channel has its own ResultStream and text queue
+    """
+    def __init__(self, speech_recognizer, inputs, model_path=None, workers=None):
+        self.logger = logging.getLogger(__name__)
+        self.speech_recognizer = speech_recognizer
+        self.config = speech_recognizer.config
+        self.inputs = inputs
+        self.model_path = model_path or self.config['model_path']
+        self.workers = workers or os.cpu_count() or 1
+        self.sample_rate = self.config['sample_rate']
+        self.devices = []
+        self.channels = {}
+        self.executor = None
+        self._started_at = None
+        self._cpu_started = None
+        self._wall_seconds = None
+        self._cpu_seconds = None
+
+    def channel_names(self):
+        return list(self.channels.keys())
+
+    def subscribe(self, channel_name):
+        """Partial and final TranscriptResults of one channel, close() the subscription when done"""
+        return self.channels[channel_name].results.subscribe()
+
+    def text_queue(self, channel_name):
+        return self.channels[channel_name].text_queue
+
+    def start(self):
+        results_config = self.config.get('results', {})
+        min_partial_interval = results_config.get('partial_interval_ms', 100) / 1000
+        text_queue_size = results_config.get('text_queue_size', 1000)
+        max_batch_ms = self.config.get('decoder', {}).get('max_batch_ms', 200)
+        buffer_seconds = self.config.get('capture_buffer', {}).get('seconds', 120)
+        chunk_size = self.config.get('chunk_size', 2048)
+        # Channel queues hold views into their device's ring, keep them shorter than the ring
+        queue_blocks = min(self.config.get('recognizer_queue_blocks', 512),
+                           max_view_blocks(buffer_seconds * self.sample_rate, chunk_size))
+
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='channel-decode')
+        model_cache = self.speech_recognizer.model_cache
+        for number, spec in enumerate(self.inputs):
+            device = spec.get('device')
+            channel_count = spec.get('channels', 1)
+            device_input = DeviceInput(spec.get('name', f"input{number + 1}"), device, channel_count,
+                                       self.sample_rate, chunk_size, buffer_seconds,
+                                       device_rate=self.speech_recognizer.device_sample_rate(device))
+            self.devices.append(device_input)
+
+            for channel in range(channel_count):
+                name = f"{device_input.name}/ch{channel + 1}"
+                # Recognizers share the cached model
+                stream = ChannelStream(name, model_cache.create_recognizer(self.model_path, self.sample_rate),
+                                       min_partial_interval, text_queue_size)
+                subscription = device_input.audio_bus.subscribe(name, maxsize=queue_blocks, policy=DROP_OLDEST)
+                stream.scheduler = DecodeScheduler(
+                    subscription,
+                    lambda data, stream=stream: self.executor.submit(stream.decode, data).result(),
+                    self.sample_rate,
+                    dtype=CAPTURE_DTYPE,
+                    max_batch_ms=max_batch_ms,
+                    channel=channel
+                )
+                self.channels[name] = stream
+
+        self._started_at = time.perf_counter()
+        self._cpu_started = time.process_time()
+        try:
+            for device_input in self.devices:
+                device_input.capture.start()
+        except Exception as e:
+            self.logger.error(f"Multi-channel capture start error: {e}")
+            self.stop()
+            raise
+        for stream in self.channels.values():
+            stream.scheduler.start()
+        self.logger.info(f"Multi-channel session started: {len(self.channels)} channels, "
+                         f"{self.workers} decode workers")
+
+    def stop(self):
+        """Stop capture, decode what is queued and publish each channel's final result"""
+        for device_input in self.devices:
+            device_input.capture.stop()
+        for stream in self.channels.values():
+            if stream.scheduler is not None:
+                stream.scheduler.stop()
+        if self.executor is not None:
+            for future in [self.executor.submit(stream.finish) for stream in self.channels.values()]:
+                try:
+                    future.result()
+                except Exception as e:
+                    self.logger.error(f"Channel final result error: {e}")
+            self.executor.shutdown(wait=True)
+            self.executor = None
+        for stream in self.channels.values():
+            stream.results.close()
+        for device_input in self.devices:
+            device_input.capture_buffer.close()
+
+        if self._started_at is not None:
+            self._wall_seconds = time.perf_counter() - self._started_at
+            self._cpu_seconds = time.process_time() - self._cpu_started
+        self.logger.info("Multi-channel session stopped")
+
+    def metrics(self):
+        """
+        Per-channel decoder metrics plus aggregate CPU and lag
+        - cpu_utilization is process CPU time over wall time, 1.0 is one busy core
+        """
+        channels = {name: stream.scheduler.metrics() for name, stream in self.channels.items()}
+        if self._wall_seconds is not None:
+            wall_seconds, cpu_seconds = self._wall_seconds, self._cpu_seconds
+        elif self._started_at is not None:
+            wall_seconds = time.perf_counter() - self._started_at
+            cpu_seconds = time.process_time() - self._cpu_started
+        else:
+            wall_seconds, cpu_seconds = 0.0, 0.0
+        audio_seconds = sum(stream.scheduler.frames_decoded for stream in self.channels.values()) / self.sample_rate
+        return {
+            'channels': channels,
+            'workers': self.workers,
+            'wall_seconds': wall_seconds,
+            'cpu_seconds': cpu_seconds,
+            'cpu_utilization': cpu_seconds / wall_seconds if wall_seconds else 0.0,
+            'cpu_per_audio_second': cpu_seconds / audio_seconds if audio_seconds else 0.0,
+            'max_lag_seconds': max((m['lag_seconds'] for m in channels.values()), default=0.0),
+            'dropped_blocks': sum(m['dropped_blocks'] for m in channels.values()),
+        }
@@ -0,0 +1,53 @@
+import json
+import time
+import argparse
+import logging
+import threading
+
+from speech_recognizer import SpeechRecognizer
+from transcription_results import FINAL
+
+
+def parse_input(value):
+    """DEVICE[:CHANNELS], e.g. 2:4 for all four channels of device 2"""
+    device, _, channels = value.partition(':')
+    return {'device': int(device), 'channels': int(channels or 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Transcribe several inputs or channels concurrently')
+    parser.add_argument('-i', '--input', action='append', type=parse_input, default=[],
+                        help='DEVICE[:CHANNELS] (repeatable), defaults to config multi_channel.inputs')
+    parser.add_argument('-m', '--model', help='Language model name')
+    parser.add_argument('--workers', type=int, help='Decode threads (defaults to CPU count)')
+    parser.add_argument('-c', '--config', default='./config/config.json', help='Configuration file')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s: %(message)s')
+
+    recognizer = SpeechRecognizer(args.config)
+    session = recognizer.start_multi_channel(args.input or None, args.model, args.workers)
+
+    def print_finals(name, subscription):
+        for result in subscription:
+            if result.kind == FINAL:
+                print(f"[{name}] {result.text}", flush=True)
+
+    printers = [threading.Thread(target=print_finals, args=(name, session.subscribe(name)), daemon=True)
+                for name in session.channel_names()]
+    for printer in printers:
+        printer.start()
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    recognizer.stop_multi_channel()
+    for printer in printers:
+        printer.join()
+    print(json.dumps(session.metrics(), indent=2))
+
+
+if __name__ == '__main__':
+    main()
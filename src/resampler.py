@@ -0,0 +1,109 @@
+from math import gcd
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def design_filter(up, down, zero_crossings=16, rolloff=0.94, beta=8.6):
+    """
+    Kaiser-windowed sinc prototype for rational resampling by up/down
+    - Cut off just below the lower of the two Nyquist frequencies
+    - Returned as a (up, taps) polyphase bank, taps reversed for a dot product with ascending input
+    """
+    # In input samples, downsampling widens the sinc by down/up
+    width = max(1.0, down / up)
+    taps = 2 * int(np.ceil(zero_crossings * width)) + 1
+    length = taps * up
+    cutoff = rolloff / max(up, down)  # Fraction of the upsampled Nyquist
+    # Centred on a whole upsampled sample, so the delay can be compensated exactly
+    delay = (length - 1) // 2
+    n = np.arange(length) - delay
+    prototype = cutoff * np.sinc(cutoff * n) * np.kaiser(length, beta)
+    # Unity gain per phase after the implicit zero stuffing
+    prototype *= up / prototype.sum()
+    bank = prototype.reshape(taps, up).T[:, ::-1]
+    return np.ascontiguousarray(bank, dtype=np.float32), delay
+
+
+class StreamingResampler:
+    """
+    Stateful polyphase resampler for block-wise audio
+    - Rational ratio from the two rates, filter bank designed once
+    - Carries input history across blocks, so block boundaries are seamless
+    - Output is aligned with the input (the filter delay is compensated) and keeps the input dtype
+    - Accepts (frames,) or (frames, channels) blocks, every output row is one vectorized dot product
+    """
+    def __init__(self, source_rate, target_rate, channels=1, zero_crossings=16):
+        self.source_rate = int(source_rate)
+        self.target_rate = int(target_rate)
+        divisor = gcd(self.source_rate, self.target_rate)
+        self.up = self.target_rate // divisor
+        self.down = self.source_rate // divisor
+        self.channels = channels
+        self.passthrough = self.up == self.down
+        self.bank, delay = design_filter(self.up, self.down, zero_crossings)
+        self.taps = self.bank.shape[1]
+
+        # Input history (zeros before the first block), in float32
+        self._history = np.zeros((self.taps - 1, channels), dtype=np.float32)
+        # Position of the next output sample in upsampled units, relative to the history start
+        self._position = (self.taps - 1) * self.up + delay
+        self.frames_in = 0
+        self.frames_out = 0
+
+    def expected_output(self, frames_in):
+        return -(-frames_in * self.up // self.down)
+
+    def process(self, block):
+        if self.passthrough:
+            return block
+        dtype = block.dtype
+        squeeze = block.ndim == 1
+        data = block.reshape(len(block), -1)
+        if np.issubdtype(dtype, np.integer):
+            data = data.astype(np.float32) * (1.0 / -np.iinfo(dtype).min)
+        self.frames_in += len(data)
+        output = self._filter(data)
+        self.frames_out += len(output)
+        return self._output(output, dtype, squeeze)
+
+    def flush(self, dtype=np.float32):
+        """Output still held back by the filter delay as (frames, channels), trimmed to the exact resampled length"""
+        if self.passthrough:
+            return np.empty((0, self.channels), dtype=dtype)
+        missing = self.expected_output(self.frames_in) - self.frames_out
+        output = np.empty((0, self.channels), dtype=np.float32)
+        while missing > len(output):
+            output = np.concatenate((output, self._filter(np.zeros((self.taps, self.channels), dtype=np.float32))))
+        output = output[:max(missing, 0)]
+        self.frames_out += len(output)
+        return self._output(output, np.dtype(dtype), False)
+
+    def _filter(self, data):
+        buffer = np.concatenate((self._history, data))
+        # Outputs whose newest input frame is already in the buffer
+        limit = len(buffer) * self.up - 1
+        count = (limit - self._position) // self.down + 1 if self._position <= limit else 0
+        if count:
+            positions = self._position + self.down * np.arange(count)
+            index = positions // self.up
+            phase = positions - index * self.up
+            # Row i holds buffer[index - taps + 1 .. index] per channel, a strided view
+            windows = sliding_window_view(buffer, self.taps, axis=0)[index - (self.taps - 1)]
+            output = np.einsum('nct,nt->nc', windows, self.bank[phase])
+            self._position += self.down * count
+        else:
+            output = np.empty((0, buffer.shape[1]), dtype=np.float32)
+        # Keep the last taps-1 frames, positions shift with the dropped prefix
+        consumed = len(buffer) - (self.taps - 1)
+        self._history = buffer[consumed:].copy()
+        self._position -= consumed * self.up
+        return output
+
+    def _output(self, output, dtype, squeeze):
+        if np.issubdtype(dtype, np.integer):
+            info = np.iinfo(dtype)
+            output = np.clip(np.rint(output * -info.min), info.min, info.max).astype(dtype)
+        else:
+            output = output.astype(dtype, copy=False)
+        return output[:, 0] if squeeze else output
@@ -0,0 +1,97 @@
+import os
+import json
+import time
+import queue
+import threading
+import logging
+
+from model_cache import ModelCache
+from segment_decoder import merge_results
+
+
+class RescoringWorker:
+    """
+    Low-priority second pass over finished segments with a larger model
+    - One background thread, lowered to the given nice level where the OS allows per-thread priority
+    - Duty-cycled to cpu_budget of one core: every decode call is followed by a proportional sleep
+    - Uses its own single-model cache, so the large model never evicts the live models
+    - Bounded queue, segments beyond max_pending are skipped and keep their live text
+    """
+    def __init__(self, sample_rate, on_refined, cpu_budget=0.5, nice=10, max_pending=100, block_frames=8000):
+        self.logger = logging.getLogger(__name__)
+        self.sample_rate = sample_rate
+        self.on_refined = on_refined
+        self.cpu_budget = min(max(cpu_budget, 0.01), 1.0)
+        self.nice = nice
+        self.block_frames = block_frames
+        self.model_cache = ModelCache(max_models=1)
+
+        self.refined = 0
+        self.skipped = 0
+        self.busy_seconds = 0.0
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._run, name='rescoring', daemon=True)
+        self._thread.start()
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def submit(self, key, model_path, audio, context=None):
+        """Queue audio for rescoring, on_refined(key, raw_result, context) is called when done"""
+        try:
+            self._queue.put_nowait((key, model_path, audio, context))
+            return True
+        except queue.Full:
+            self.skipped += 1
+            return False
+
+    def close(self):
+        """Stop after the segment in progress, anything still queued keeps its live text"""
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        self._queue.put(None)
+        self._thread.join()
+
+    def _lower_priority(self):
+        # On Linux setpriority on the thread id only affects this thread
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), self.nice)
+        except (AttributeError, OSError) as e:
+            self.logger.warning(f"Could not lower rescoring priority: {e}")
+
+    def _run(self):
+        self._lower_priority()
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            key, model_path, audio, context = item
+            try:
+                raw_result = self._decode(model_path, audio)
+                self.refined += 1
+                self.on_refined(key, raw_result, context)
+            except Exception as e:
+                self.logger.error(f"Rescoring error: {e}")
+
+    def _decode(self, model_path, audio):
+        recognizer = self.model_cache.create_recognizer(model_path, self.sample_rate)
+        recognizer.SetWords(True)
+        parts = []
+        for position in range(0, len(audio), self.block_frames):
+            started = time.perf_counter()
+            if recognizer.AcceptWaveform(audio[position:position + self.block_frames].tobytes()):
+                parts.append(json.loads(recognizer.Result()))
+            self._throttle(time.perf_counter() - started)
+        started = time.perf_counter()
+        parts.append(json.loads(recognizer.FinalResult()))
+        self._throttle(time.perf_counter() - started)
+        return merge_results(parts)
+
+    def _throttle(self, busy):
+        # Sleep so that busy time stays at cpu_budget of wall time
+        self.busy_seconds += busy
+        if self.cpu_budget < 1.0:
+            time.sleep(busy * (1.0 - self.cpu_budget) / self.cpu_budget)
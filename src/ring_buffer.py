@@ -0,0 +1,184 @@
+import os
+import tempfile
+import threading
+import logging
+
+import numpy as np
+
+
+def max_view_blocks(capacity_frames, block_frames):
+    """
+    Most blocks a consumer may hold as ring views before the writer overwrites the oldest
+    - One block is kept spare for the block being written and one for resampled blocks running long
+    """
+    return max(1, int(capacity_frames) // max(1, int(block_frames)) - 2)
+
+
+class AudioRingBuffer:
+    """
+    Preallocated ring buffer for captured audio
+    - The audio callback copies each block in exactly once
+    - Frames are addressed by a monotonic index (total frames written)
+    - Consumers get views into the buffer, valid until capacity more frames arrive
+    - Optionally spills to a raw temp file so long sessions stay exportable
+    """
+    def __init__(self, capacity_frames, channels=1, dtype='float32', spill_to_disk=False, spill_dir=None):
+        self.logger = logging.getLogger(__name__)
+        self.capacity = int(capacity_frames)
+        self.channels = channels
+        self.dtype = np.dtype(dtype)
+        self.buffer = np.zeros((self.capacity, channels), dtype=self.dtype)
+        self.frames_written = 0
+
+        self.spiller = RingSpiller(self, spill_dir) if spill_to_disk else None
+
+    @property
+    def oldest_frame(self):
+        # Oldest frame still held in memory
+        return max(0, self.frames_written - self.capacity)
+
+    def write(self, block):
+        """
+        Copy a block into the ring and return a read-only view of it
+        - Blocks that wrap around the end are returned as a copy
+        """
+        frames = len(block)
+        if frames > self.capacity:
+            # Only the newest frames fit, keep the clock advancing for the rest
+            self.frames_written += frames - self.capacity
+            block = block[-self.capacity:]
+            frames = self.capacity
+
+        start = self.frames_written % self.capacity
+        end = start + frames
+        if end <= self.capacity:
+            self.buffer[start:end] = block
+            view = self.buffer[start:end]
+        else:
+            split = self.capacity - start
+            self.buffer[start:] = block[:split]
+            self.buffer[:end - self.capacity] = block[split:]
+            view = np.array(block, dtype=self.dtype)
+        self.frames_written += frames
+
+        if self.spiller is not None:
+            self.spiller.notify()
+        view = view.view()
+        view.flags.writeable = False
+        return view
+
+    def read(self, start, end=None):
+        """Return up to two views covering frames [start, end) held in memory"""
+        end = self.frames_written if end is None else min(end, self.frames_written)
+        if start < self.oldest_frame:
+            raise ValueError(f"Frames before {self.oldest_frame} were overwritten")
+        if start >= end:
+            return []
+        first = start % self.capacity
+        last = first + (end - start)
+        if last <= self.capacity:
+            return [self.buffer[first:last]]
+        return [self.buffer[first:], self.buffer[:last - self.capacity]]
+
+    def iter_frames(self, start=0, end=None, chunk_frames=65536):
+        """Yield frames [start, end) in chunks, from the spill file when no longer in memory"""
+        end = self.frames_written if end is None else min(end, self.frames_written)
+        position = start
+        if position < self.oldest_frame:
+            if self.spiller is None:
+                raise ValueError(f"Frames before {self.oldest_frame} were overwritten and not spilled")
+            self.spiller.flush()
+            spilled_end = min(end, self.spiller.spilled_frames)
+            for chunk in self.spiller.iter_frames(position, spilled_end, chunk_frames):
+                yield chunk
+            position = spilled_end
+        for view in self.read(position, end):
+            yield view
+
+    def export(self, filename, samplerate, start=0, end=None, **kwargs):
+        """Write frames [start, end) straight to an audio file, without concatenating"""
+        end = self.frames_written if end is None else end
+        if end <= start:
+            return None
+        import soundfile as sf
+        with sf.SoundFile(filename, 'w', samplerate=samplerate, channels=self.channels, **kwargs) as audio_file:
+            for chunk in self.iter_frames(start, end):
+                audio_file.write(chunk)
+        return filename
+
+    def close(self):
+        if self.spiller is not None:
+            self.spiller.close()
+            self.spiller = None
+
+
+class RingSpiller:
+    """
+    Background thread copying ring buffer contents to a raw temp file
+    - Runs behind the writer so the audio callback never touches the disk
+    """
+    def __init__(self, ring, spill_dir=None):
+        self.logger = logging.getLogger(__name__)
+        self.ring = ring
+        self.spilled_frames = 0
+        self.lost_frames = 0
+        self.frame_bytes = ring.channels * ring.dtype.itemsize
+
+        handle, path = tempfile.mkstemp(prefix='capture_', suffix='.raw', dir=spill_dir)
+        self._file = os.fdopen(handle, 'w+b')
+        # Unlinked while open, so the spill never outlives the process, even after a crash
+        try:
+            os.unlink(path)
+            self.path = None
+        except OSError:
+            # Open files cannot be unlinked on Windows, removed on close instead
+            self.path = path
+        self._wakeup = threading.Event()
+        self._running = True
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name='ring-spiller', daemon=True)
+        self._thread.start()
+
+    def notify(self):
+        self._wakeup.set()
+
+    def _run(self):
+        while self._running:
+            self._wakeup.wait(0.5)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            written = self.ring.frames_written
+            oldest = self.ring.oldest_frame
+            if self.spilled_frames < oldest:
+                # The spiller fell more than a full ring behind, pad the gap with silence
+                gap = oldest - self.spilled_frames
+                self.lost_frames += gap
+                self.logger.warning(f"Capture spill fell behind, {gap} frames lost")
+                self._file.write(bytes(gap * self.frame_bytes))
+                self.spilled_frames = oldest
+            for view in self.ring.read(self.spilled_frames, written):
+                view.tofile(self._file)
+            self.spilled_frames = written
+            self._file.flush()
+
+    def iter_frames(self, start, end, chunk_frames):
+        if end <= start:
+            return
+        data = np.memmap(self._file, dtype=self.ring.dtype, mode='r',
+                         shape=(self.spilled_frames, self.ring.channels))
+        for position in range(start, end, chunk_frames):
+            yield data[position:min(end, position + chunk_frames)]
+
+    def close(self):
+        self._running = False
+        self._wakeup.set()
+        self._thread.join()
+        self._file.close()
+        if self.path is not None:
+            try:
+                os.remove(self.path)
+            except OSError as e:
+                self.logger.error(f"Spill file cleanup error: {e}")
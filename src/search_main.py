@@ -0,0 +1,49 @@
+import os
+import json
+import argparse
+
+from transcript_store import TranscriptStore
+
+
+def export_clip(hit, directory):
+    """Write a hit's audio range to its own file, read straight from the recording at the stored offset"""
+    import soundfile as sf
+    frames = hit['end_sample'] - hit['start_sample']
+    audio, samplerate = sf.read(hit['audio_file'], start=hit['file_offset'], frames=frames, dtype='int16')
+    os.makedirs(directory, exist_ok=True)
+    filename = os.path.join(directory, f"hit_{hit['segment_id']}.wav")
+    sf.write(filename, audio, samplerate)
+    return filename
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Search stored transcripts')
+    parser.add_argument('query', help='Words to find, all of them must match')
+    parser.add_argument('--raw', action='store_true', help='Treat the query as FTS5 syntax (AND/OR/NEAR, prefix*)')
+    parser.add_argument('-s', '--session', help='Limit to one session ID')
+    parser.add_argument('-n', '--limit', type=int, default=20)
+    parser.add_argument('--db', default='transcripts/transcripts.db', help='Transcript store path')
+    parser.add_argument('--export', metavar='DIR', help='Write the audio of each hit to DIR')
+    parser.add_argument('--json', action='store_true', help='Print hits as JSON lines')
+    args = parser.parse_args()
+
+    store = TranscriptStore(args.db)
+    try:
+        hits = store.search(args.query, args.session, args.limit, raw=args.raw)
+    except ValueError as e:
+        store.close()
+        parser.error(str(e))
+    for hit in hits:
+        if args.export and hit['audio_file'] and hit['end_sample'] is not None:
+            hit['clip'] = export_clip(hit, args.export)
+        if args.json:
+            print(json.dumps(hit, ensure_ascii=False))
+        else:
+            position = f"{hit['start_time']:.2f}-{hit['end_time']:.2f}s" if hit.get('end_time') is not None else '?'
+            location = f"{hit['audio_file']} @ {hit['file_offset']}" if hit['audio_file'] else 'no audio'
+            print(f"{hit['session_id'][:8]} {position} {hit['snippet']} ({location})")
+    store.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+import os
+import json
+import time
+import threading
+import logging
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import MetricsRegistry
+
+# start/end are capture-clock samples, audio is a private int16 copy of that range
+Segment = namedtuple('Segment', ['index', 'start', 'end', 'audio', 'filename', 'closed_at'])
+
+
+def merge_results(parts):
+    """Join the Result()/FinalResult() dicts of one segment into a single result JSON string"""
+    texts = [part.get('text', '') for part in parts if part.get('text', '').strip()]
+    words = [word for part in parts for word in part.get('result', [])]
+    return json.dumps({'text': ' '.join(texts), 'result': words})
+
+
+def shift_words(result, offset):
+    """Move a result dict's word times back by offset seconds, in place"""
+    for word in result.get('result', []):
+        word['start'] -= offset
+        word['end'] -= offset
+    return result
+
+
+class SegmentDecoderPool:
+    """
+    Finalizes closed speech segments on a pool of independent recognizers
+    - Each segment is decoded start to finish by its own recognizer on the shared cached model,
+      word times are shifted to be relative to the segment start
+    - With a grammar, recognizers are reused from the cache instead of recompiling the grammar
+    - Segments finalize in parallel with capture and with each other
+    - Results are reassembled in segment order before on_final is called
+    - Recognizer time is counted in segment_decode_seconds_total, apart from the live decoder's
+    """
+    def __init__(self, model_cache, model_path, sample_rate, on_final, workers=None, block_frames=8000,
+                 grammar=None, metrics=None):
+        self.logger = logging.getLogger(__name__)
+        self.model_cache = model_cache
+        self.model_path = model_path
+        self.sample_rate = sample_rate
+        self.on_final = on_final
+        self.workers = workers or os.cpu_count() or 1
+        self.block_frames = block_frames
+        self.grammar = grammar
+        metrics = metrics or MetricsRegistry()
+        self.decode_seconds = metrics.counter('segment_decode_seconds_total', 'Recognizer time finalizing segments')
+        self.decoded_frames = metrics.counter('segment_decoded_frames_total', 'Frames decoded by the segment pool')
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='segment-decode')
+
+        self._next_index = 0
+        self._next_to_publish = 0
+        self._finished = {}
+        self._lock = threading.Lock()
+        self.pending = 0
+
+    def submit(self, start, end, audio, filename=None):
+        with self._lock:
+            segment = Segment(self._next_index, start, end, audio, filename, time.perf_counter())
+            self._next_index += 1
+            self.pending += 1
+        self.executor.submit(self._decode, segment)
+        return segment.index
+
+    def _decode(self, segment):
+        raw_result = None
+        started = time.perf_counter()
+        try:
+            cached = self.model_cache.checkout_recognizer(self.model_path, self.sample_rate, self.grammar)
+            try:
+                recognizer = cached.recognizer
+                recognizer.SetWords(True)
+                # Fixed-size pieces keep each native call short, endpoints inside the segment are kept
+                parts = []
+                for position in range(0, len(segment.audio), self.block_frames):
+                    if recognizer.AcceptWaveform(segment.audio[position:position + self.block_frames].tobytes()):
+                        parts.append(json.loads(recognizer.Result()))
+                parts.append(json.loads(recognizer.FinalResult()))
+                # Before checkin, another worker may take this recognizer and move its start
+                for part in parts:
+                    shift_words(part, cached.offset)
+                cached.frames += len(segment.audio)
+            finally:
+                self.model_cache.checkin(cached)
+            raw_result = merge_results(parts)
+        except Exception as e:
+            self.logger.error(f"Segment {segment.index} decode error: {e}")
+        self._reassemble(segment, raw_result, time.perf_counter() - started)
+
+    def _reassemble(self, segment, raw_result, decode_seconds):
+        # Publishing happens under the lock, so results leave strictly in segment order
+        with self._lock:
+            self.decode_seconds.inc(decode_seconds)
+            self.decoded_frames.inc(len(segment.audio))
+            self._finished[segment.index] = (segment, raw_result)
+            while self._next_to_publish in self._finished:
+                ready, result = self._finished.pop(self._next_to_publish)
+                self._next_to_publish += 1
+                self.pending -= 1
+                if result is not None:
+                    try:
+                        self.on_final(ready, result)
+                    except Exception as e:
+                        self.logger.error(f"Segment {ready.index} result error: {e}")
+
+    def close(self):
+        """Wait for every submitted segment to be decoded and published"""
+        self.executor.shutdown(wait=True)
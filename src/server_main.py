@@ -0,0 +1,33 @@
+import argparse
+import logging
+
+from speech_recognizer import SpeechRecognizer
+from transcription_server import TranscriptionServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the local transcription server')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on')
+    parser.add_argument('--port', type=int, default=2700, help='TCP port')
+    parser.add_argument('--max-sessions', type=int, help='Concurrent sessions (defaults to decode workers)')
+    parser.add_argument('--workers', type=int, help='Decode threads (defaults to CPU count)')
+    parser.add_argument('-c', '--config', default='./config/config.json', help='Configuration file')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s: %(message)s')
+
+    server = TranscriptionServer(
+        SpeechRecognizer(args.config),
+        host=args.host,
+        port=args.port,
+        max_sessions=args.max_sessions,
+        decode_workers=args.workers
+    )
+    try:
+        server.run()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
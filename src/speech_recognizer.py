@@ -1,16 +1,41 @@
 import json  
 import os  
-import vosk  
-import sounddevice as sd  
-import soundfile as sf  
 import numpy as np  
 import queue  
 import threading  
 import logging  
+import time
+import bisect
 from datetime import datetime  
+from contextlib import contextmanager
+from model_cache import get_model_cache
+from audio_bus import AudioBus, DROP_OLDEST
+from ring_buffer import AudioRingBuffer, max_view_blocks
+from stream_recorder import StreamingRecorder
+from vad import create_vad
+from decode_scheduler import DecodeScheduler
+from capture_pipeline import CapturePipeline, CAPTURE_DTYPE
+from transcription_results import ResultStream, ResultEmitter, parse_words, put_latest
+from metrics import MetricsRegistry, MetricsServer
+from multi_channel import MultiChannelSession
+from transcript_store import TranscriptStore
+from segment_decoder import SegmentDecoderPool, shift_words
+from rescoring import RescoringWorker
+from language_id import LanguageRace
+
+# Model name that races the candidate models instead of using a fixed one
+AUTO_LANGUAGE = 'Auto detect'
 
 class SpeechRecognizer:  
-    def __init__(self, config_path='./config/config.json'):  
+    def __init__(self, config_path='./config/config.json', defer_init=False):  
+        """
+        Cheap setup only, the slow work lives in initialize()
+        - defer_init=True leaves device enumeration and the model load to the caller,
+          e.g. a background thread while the window is already shown
+        """
+        started = time.perf_counter()
+        self.startup_timings = {}
+
         # Logging setup  
         logging.basicConfig(  
             level=logging.INFO,   
@@ -40,34 +65,419 @@ class SpeechRecognizer:
             "Spanish": "./models/vosk-model-small-es-0.42"  
         }  
 
-        # Initialize Vosk model  
-        self.set_language_model(self.config['model_path'])  
+        # Shared model registry, models are loaded once per process
+        cache_config = self.config.get('model_cache', {})
+        self.model_cache = get_model_cache(
+            max_models=cache_config.get('max_models', 2),
+            memory_budget_mb=cache_config.get('memory_budget_mb')
+        )
+
+        # Pipeline counters and histograms, optionally served over local HTTP
+        self.metrics = MetricsRegistry()
+        self.metrics_server = None
+        self.setup_metrics()
+
+        # Structured partial/final results, text_queue keeps receiving the latest final texts
+        results_config = self.config.get('results', {})
+        self.results = ResultStream()
+        self.result_emitter = ResultEmitter(
+            self.results, min_partial_interval=results_config.get('partial_interval_ms', 100) / 1000)
+
+        # Final transcripts with word positions, linked to the recorded audio
+        store_config = self.config.get('transcript_store', {})
+        self.transcript_store = None
+        if store_config.get('enabled', True):
+            try:
+                self.transcript_store = TranscriptStore(store_config.get('path', 'transcripts/transcripts.db'))
+            except Exception as e:
+                self.logger.error(f"Transcript store error: {e}")
+        self.session_id = None
+        self.fed_frames = 0
+        self.recognizer_offset = 0
+        self.clock_anchors = [(0, 0)]
+
+        # Vosk model, loaded by initialize()
+        self.model = None
+        self.recognizer = None
+        self.live_recognizer = None
+        self.model_path = None
+        self.grammar = None
+        self.ready = threading.Event()
         
         # Audio capture setup  
         self.is_recording = False  
-        self.audio_queue = queue.Queue()  
-        self.text_queue = queue.Queue()  
-        self.recorded_audio = []  
+        self.audio_bus = AudioBus()
+        self.subscribe_consumers()
+        self.text_queue = self.create_text_queue()
+        self.capture_buffer = None
+        self.recorder = None
+        self.decode_scheduler = None
+        self.capture = None
+        self.multi_channel_session = None
+        self.segment_pool = None
+        self.rescorer = None
+        self.language_race = None
+        self.pending_segments = []
+        self.detected_language = None
+        self.language_race_seconds = 0.0
+        # Created per session, so an idle recognizer holds no spill file or spill thread
+        self.segment_start = 0
         
         # Continuous transcription mode  
         self.continuous_mode = False  
         self.silence_threshold = 0.01  # Adjust based on your environment  
         self.silence_duration = 1.0  # Seconds of silence to trigger pause  
-        self.last_speech_time = None  
+        self.vad = None
         
-        # Get available audio devices  
-        self.devices = sd.query_devices()  
-        self.device_names = [device['name'] for device in self.devices]  
+        # Available audio devices, enumerated by initialize()
+        self.devices = []
+        self.device_names = []
+        self.record_startup_phase('setup', time.perf_counter() - started)
+
+        if not defer_init:
+            self.initialize()
+
+    def initialize(self, progress=None):
+        """
+        Slow startup work, safe to run off the UI thread
+        - Enumerates audio devices, loads the configured model and starts preloads
+        - progress(message, fraction) is called before each phase
+        """
+        report = progress or (lambda message, fraction: None)
+
+        report('Listing audio devices', 0.0)
+        with self.startup_phase('devices'):
+            try:
+                self.enumerate_devices()
+            except Exception as e:
+                self.logger.error(f"Audio device error: {e}")
+
+        report('Loading language model', 0.2)
+        with self.startup_phase('model'):
+            self.set_language_model(self.config['model_path'])
 
-    def set_language_model(self, model_path):  
+        # Warm up the other configured languages in the background
+        cache_config = self.config.get('model_cache', {})
+        preload_paths = [self.available_models[name] for name in cache_config.get('preload', [])
+                         if name in self.available_models]
+        if preload_paths:
+            self.model_cache.preload(preload_paths)
+
+        self.ready.set()
+        report('Ready', 1.0)
+        self.logger.info("Startup timings: " + ", ".join(
+            f"{phase} {seconds:.3f}s" for phase, seconds in self.startup_timings.items()))
+
+    @contextmanager
+    def startup_phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_startup_phase(name, time.perf_counter() - started)
+
+    def record_startup_phase(self, name, seconds):
+        self.startup_timings[name] = seconds
+        self.metrics.gauge(f'startup_{name}_seconds', f'Startup phase duration: {name}').set(seconds)
+
+    def enumerate_devices(self):
+        # PortAudio is loaded here rather than at import time
+        import sounddevice as sd
+        self.devices = sd.query_devices()
+        self.device_names = [device['name'] for device in self.devices]
+        return self.device_names
+
+    def set_language_model(self, model_path, grammar=None):  
         try:  
-            self.model = vosk.Model(model_path)  
-            self.recognizer = vosk.KaldiRecognizer(self.model, self.config['sample_rate'])  
-            self.logger.info(f"Loaded model from {model_path}")  
+            self.model = self.model_cache.get_model(model_path)
+            self.release_recognizer()
+            # Grammar recognizers come back from the cache, their clock continues from earlier sessions
+            self.live_recognizer = self.model_cache.checkout_recognizer(
+                model_path, self.config['sample_rate'], grammar)
+            self.recognizer = self.live_recognizer.recognizer
+            self.recognizer_offset = self.live_recognizer.frames
+            self.fed_frames = 0
+            self.recognizer.SetWords(True)
+            self.recognizer.SetPartialWords(self.config.get('results', {}).get('partial_words', False))
+            self.model_path = model_path
+            self.grammar = grammar
+            self.logger.info(f"Using model from {model_path}" + (f" with {len(grammar)} phrases" if grammar else ""))
         except Exception as e:  
             self.logger.error(f"Model loading error: {e}")  
             raise  
 
+    def release_recognizer(self):
+        if self.live_recognizer is not None:
+            self.live_recognizer.frames = self.recognizer_offset + self.fed_frames
+            self.model_cache.checkin(self.live_recognizer)
+            self.live_recognizer = None
+
+    def resolve_grammar(self, grammar=None):
+        """
+        Phrase list for a session
+        - A name from config "grammars", a list of phrases, or None for the config default ("grammar")
+        - Returns None for open vocabulary
+        """
+        grammar = grammar if grammar is not None else self.config.get('grammar')
+        if not grammar:
+            return None
+        if isinstance(grammar, str):
+            phrases = self.config.get('grammars', {}).get(grammar)
+            if phrases is None:
+                raise ValueError(f"Unknown grammar: {grammar}")
+            return phrases
+        return list(grammar)
+
+    def get_grammars(self):
+        return list(self.config.get('grammars', {}).keys())
+
+    def prepare_recognizer(self, model_name=None, grammar=None):
+        # A recognizer per session, word times are mapped from where its clock starts
+        if self.language_race is not None:
+            # A race left undecided by an earlier session
+            self.language_race.release()
+        self.language_race = None
+        self.pending_segments = []
+        if model_name == AUTO_LANGUAGE:
+            # The provisional model is replaced once the race picks the language
+            self.language_race = self.create_language_race()
+            model_name = None
+        model_path = self.available_models.get(model_name) if model_name else None
+        self.set_language_model(model_path or self.model_path or self.config['model_path'],
+                                self.resolve_grammar(grammar))
+
+    def create_language_race(self):
+        language_config = self.config.get('language_id', {})
+        names = language_config.get('candidates') or list(self.available_models.keys())
+        candidates = {name: self.available_models[name] for name in names if name in self.available_models}
+        self.detected_language = None
+        try:
+            return LanguageRace(self.model_cache, candidates, self.config['sample_rate'],
+                                seconds=language_config.get('seconds', 3.0),
+                                workers=language_config.get('workers'))
+        except Exception as e:
+            self.logger.error(f"Language identification unavailable, using the default model: {e}")
+            return None
+
+    def finish_language_race(self):
+        """
+        Switch to the winning model and decode the raced audio with it
+        - Runs on the decode thread, or after it has stopped
+        - Segments closed during the race are finalized with the winner
+        """
+        race, self.language_race = self.language_race, None
+        winner, audio = race.finish()
+        self.detected_language = winner
+        self.language_race_seconds = race.decided_at - race.started_at
+        # The provisional recognizer was never fed, so it goes back with its clock unchanged
+        self.set_language_model(self.available_models[winner], self.grammar)
+        race.release()
+        if self.transcript_store is not None and self.session_id is not None:
+            try:
+                self.transcript_store.set_session_model(self.session_id, self.model_path)
+            except Exception as e:
+                self.logger.error(f"Transcript store error: {e}")
+        if self.segment_pool is not None:
+            self.segment_pool.model_path = self.model_path
+            for segment in self.pending_segments:
+                self.segment_pool.submit(*segment)
+        self.pending_segments = []
+        if audio is not None:
+            # Replayed in decoder-sized batches, so endpoints inside the raced audio still split finals
+            max_batch_ms = self.config.get('decoder', {}).get('max_batch_ms', 200)
+            step = max(1, int(max_batch_ms * self.config['sample_rate'] / 1000))
+            for position in range(0, len(audio), step):
+                self.decode_audio(audio[position:position + step])
+
+    def begin_session(self, mode):
+        """
+        Start a transcript store session
+        - Recognizer time maps to capture samples through (frames fed, capture sample) anchors,
+          continuous mode adds one per speech segment since only speech is fed
+        """
+        self.fed_frames = 0
+        self.clock_anchors = [(0, 0)]
+        self.session_id = None
+        if self.transcript_store is not None:
+            try:
+                self.session_id = self.transcript_store.start_session(
+                    self.config['sample_rate'], mode, self.model_path)
+            except Exception as e:
+                self.logger.error(f"Transcript store error: {e}")
+
+    def begin_segment(self, sample):
+        self.segment_start = sample
+        # During a race the raced audio is fed later, ahead of anything after this point
+        raced = self.language_race.frames if self.language_race is not None else 0
+        self.clock_anchors.append((self.fed_frames + raced, sample))
+
+    def to_capture_sample(self, seconds):
+        frame = int(round(seconds * self.config['sample_rate']))
+        index = bisect.bisect_right([fed for fed, _ in self.clock_anchors], frame) - 1
+        fed, sample = self.clock_anchors[max(index, 0)]
+        return sample + frame - fed
+
+    def word_rows(self, words, word_offset=None):
+        """(word, start sample, end sample, confidence), word_offset is where the recognizer's clock started"""
+        rate = self.config['sample_rate']
+        if word_offset is None:
+            to_sample = self.to_capture_sample
+        else:
+            to_sample = lambda seconds: word_offset + int(round(seconds * rate))
+        return [(word.word, to_sample(word.start), to_sample(word.end), word.confidence) for word in words]
+
+    def store_final(self, final, start_sample=None, end_sample=None, word_offset=None):
+        """Append a final result to the transcript store, returns its segment ID"""
+        if self.transcript_store is None or self.session_id is None:
+            return None
+        try:
+            words = self.word_rows(final.words, word_offset)
+            if words:
+                start_sample = words[0][1] if start_sample is None else start_sample
+                end_sample = words[-1][2] if end_sample is None else end_sample
+            return self.transcript_store.add_segment(self.session_id, final.text, start_sample, end_sample, words)
+        except Exception as e:
+            self.logger.error(f"Transcript store error: {e}")
+            return None
+
+    def rescoring_model(self):
+        """Larger model configured for the live model in use, or None"""
+        rescoring_config = self.config.get('rescoring', {})
+        # Grammar sessions are already restricted to their phrases, a larger model adds nothing
+        if not rescoring_config.get('enabled', False) or self.grammar is not None:
+            return None
+        models = rescoring_config.get('models', {})
+        return models.get(self.model_path) or models.get(os.path.normpath(self.model_path))
+
+    def refine_segment(self, segment, segment_id):
+        model_path = self.rescoring_model()
+        if model_path is None or segment_id is None:
+            return
+        if self.rescorer is None:
+            # Started on first use and kept across sessions, stopping a session never waits for it
+            rescoring_config = self.config.get('rescoring', {})
+            self.rescorer = RescoringWorker(
+                self.config['sample_rate'],
+                self.apply_refinement,
+                cpu_budget=rescoring_config.get('cpu_budget', 0.5),
+                nice=rescoring_config.get('nice', 10),
+                max_pending=rescoring_config.get('max_pending', 100)
+            )
+        if not self.rescorer.submit(segment_id, model_path, segment.audio, (segment.start, model_path)):
+            self.logger.warning(f"Rescoring queue full, segment {segment_id} keeps its live text")
+
+    def apply_refinement(self, segment_id, raw_result, context):
+        # Runs on the rescoring thread, only the stored transcript is replaced
+        word_offset, model_path = context
+        result = json.loads(raw_result)
+        text = result.get('text', '')
+        if not text.strip():
+            return
+        words = self.word_rows(parse_words(result.get('result')), word_offset)
+        try:
+            self.transcript_store.replace_segment(segment_id, text, words, model_path)
+        except Exception as e:
+            self.logger.error(f"Transcript store error: {e}")
+
+    def register_audio_file(self, path, start_sample, end_sample=None):
+        if self.transcript_store is None or self.session_id is None:
+            return
+        try:
+            self.transcript_store.add_audio_file(self.session_id, path, start_sample, end_sample)
+        except Exception as e:
+            self.logger.error(f"Transcript store error: {e}")
+
+    def search_transcripts(self, query, session_id=None, limit=50, raw=False):
+        if self.transcript_store is None:
+            return []
+        return self.transcript_store.search(query, session_id, limit, raw)
+
+    def setup_metrics(self):
+        self.accept_waveform_seconds = self.metrics.histogram(
+            'accept_waveform_seconds', 'AcceptWaveform time per decode call')
+        self.decoded_frames = self.metrics.counter('decoded_frames_total', 'Frames passed to AcceptWaveform')
+        # Gauges read the current session's objects at collection time
+        self.metrics.gauge('audio_queue_depth', 'Blocks waiting for the decoder',
+                           lambda: self.audio_queue.qsize())
+        self.metrics.gauge('text_queue_depth', 'Final texts waiting for the UI',
+                           lambda: self.text_queue.qsize())
+        self.metrics.gauge('dropped_blocks', 'Blocks dropped by the recognizer queue',
+                           lambda: self.audio_queue.dropped)
+        self.metrics.gauge('dropped_frames', 'Frames dropped by the recognizer queue',
+                           lambda: self.audio_queue.dropped_frames)
+        self.segment_finalize_seconds = self.metrics.histogram(
+            'segment_finalize_seconds', 'Segment end to final result', buckets=(
+                0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0))
+        self.metrics.gauge('segments_pending', 'Closed segments not finalized yet',
+                           lambda: self.segment_pool.pending if self.segment_pool else 0)
+        self.metrics.gauge('rescoring_pending', 'Segments waiting for the rescoring pass',
+                           lambda: self.rescorer.pending() if self.rescorer else 0)
+        self.metrics.gauge('rescoring_refined', 'Segments replaced by the rescoring pass',
+                           lambda: self.rescorer.refined if self.rescorer else 0)
+        self.metrics.gauge('rescoring_skipped', 'Segments skipped because the rescoring queue was full',
+                           lambda: self.rescorer.skipped if self.rescorer else 0)
+        self.metrics.gauge('language_race_seconds', 'Wall time from the first raced block to the language decision',
+                           lambda: self.language_race_seconds)
+        self.metrics.gauge('decode_lag_seconds', 'Captured audio not decoded yet',
+                           lambda: self.decode_scheduler.lag_seconds() if self.decode_scheduler else 0.0)
+
+        metrics_config = self.config.get('metrics', {})
+        if metrics_config.get('http_port') is not None:
+            try:
+                self.metrics_server = MetricsServer(
+                    self.metrics, metrics_config.get('host', '127.0.0.1'), metrics_config['http_port'])
+                self.metrics_server.start()
+            except OSError as e:
+                self.logger.error(f"Metrics endpoint error: {e}")
+
+    def get_metrics(self):
+        return self.metrics.snapshot()
+
+    def subscribe_consumers(self):
+        # Fresh subscriptions per session so stale audio never leaks across sessions
+        self.audio_bus.clear()
+        self.audio_queue = self.audio_bus.subscribe(
+            'recognizer', maxsize=self.recognizer_queue_blocks(), policy=DROP_OLDEST)
+        self.level_queue = self.audio_bus.subscribe('level_meter', maxsize=8, policy=DROP_OLDEST, levels=True)
+
+    def recognizer_queue_blocks(self):
+        # Queued blocks are views into the capture ring, so the queue may not outlast the ring
+        blocks = self.config.get('recognizer_queue_blocks', 512)
+        capacity = int(self.config.get('capture_buffer', {}).get('seconds', 120) * self.config['sample_rate'])
+        limit = max_view_blocks(capacity, self.config.get('chunk_size', 2048))
+        if blocks > limit:
+            self.logger.warning(f"recognizer_queue_blocks {blocks} exceeds the capture buffer, using {limit}")
+            return limit
+        return blocks
+
+    def create_text_queue(self):
+        # Bounded, so final text nobody drains cannot grow over a long session
+        return queue.Queue(maxsize=self.config.get('results', {}).get('text_queue_size', 1000))
+
+    def create_capture_buffer(self, spill_to_disk=None):
+        # Preallocated once per session, the audio callback writes each block into it once
+        if self.capture_buffer is not None:
+            self.capture_buffer.close()
+        buffer_config = self.config.get('capture_buffer', {})
+        if spill_to_disk is None:
+            spill_to_disk = buffer_config.get('spill_to_disk', True)
+        self.capture_buffer = AudioRingBuffer(
+            int(buffer_config.get('seconds', 120) * self.config['sample_rate']),
+            channels=self.config['channels'],
+            dtype=CAPTURE_DTYPE,
+            spill_to_disk=spill_to_disk
+        )
+        # First frame of the continuous-mode segment being collected
+        self.segment_start = 0
+
+    def close_capture_buffer(self):
+        if self.capture_buffer is not None:
+            self.capture_buffer.close()
+
+    @property
+    def recordings_dir(self):
+        return self.config.get('recording', {}).get('directory', 'recordings')
+
     def get_available_models(self):  
         return list(self.available_models.keys())  
 
@@ -78,57 +488,48 @@ class SpeechRecognizer:
         # Calculate RMS volume  
         return np.sqrt(np.mean(audio_data**2))  
 
-    def start_recording(self, device_index=None, model_name=None):  
+    def start_recording(self, device_index=None, model_name=None, grammar=None):  
         # Reset recording state  
         self.is_recording = True  
-        self.audio_queue = queue.Queue()  
-        self.text_queue = queue.Queue()  
-        self.recorded_audio = []  
+        self.segment_pool = None
+        self.subscribe_consumers()
+        self.text_queue = self.create_text_queue()
+
+        # The streaming recorder already persists everything, no need to spill as well
+        recording_config = self.config.get('recording', {})
+        streaming = recording_config.get('streaming', True)
+        self.create_capture_buffer(spill_to_disk=False if streaming else None)
+        self.recorder = None
+        if streaming:
+            self.recorder = StreamingRecorder(
+                self.capture_buffer,
+                self.config['sample_rate'],
+                directory=self.recordings_dir,
+                file_format=recording_config.get('format', 'WAV'),
+                subtype=recording_config.get('subtype'),
+                rotate_seconds=recording_config.get('rotate_seconds'),
+                rotate_megabytes=recording_config.get('rotate_megabytes')
+            )
 
         # Set language model if specified  
-        if model_name:  
-            model_path = self.available_models.get(model_name)  
-            if model_path:  
-                self.set_language_model(model_path)  
+        self.prepare_recognizer(model_name, grammar)
+        self.begin_session('record')
 
         # Use specified device or default  
         device_index = device_index if device_index is not None else self.config['device_index']  
         
-        def audio_callback(indata, frames, time, status):  
-            if status:  
-                self.logger.warning(status)  
-            
-            # Store audio for recording and volume calculation  
-            self.audio_queue.put(indata.copy())  
-            self.recorded_audio.append(indata.copy())  
-        
-        def recognition_thread():  
-            while self.is_recording:  
-                try:  
-                    data = self.audio_queue.get(timeout=0.1)  
-                    if self.recognizer.AcceptWaveform(data.tobytes()):  
-                        result = json.loads(self.recognizer.Result())  
-                        if 'text' in result and result['text'].strip():  
-                            self.text_queue.put(result['text'])  
-                except queue.Empty:  
-                    continue  
-                except Exception as e:  
-                    self.logger.error(f"Recognition error: {e}")  
-        
         try:  
             # Start audio stream  
-            self.stream = sd.InputStream(  
-                samplerate=self.config['sample_rate'],   
-                channels=self.config['channels'],  
-                dtype='float32',  
-                callback=audio_callback,  
-                device=device_index  
-            )  
-            self.stream.start()  
+            self.capture = self.create_capture_pipeline(device_index)
+            self.capture.start()
+
+            # Start writing the recording as it arrives
+            if self.recorder is not None:
+                self.recorder.start()
             
             # Start recognition thread  
-            self.recognition_thread = threading.Thread(target=recognition_thread)  
-            self.recognition_thread.start()  
+            self.decode_scheduler = self.create_decode_scheduler()
+            self.decode_scheduler.start()
             
             self.logger.info("Recording started")  
         except Exception as e:  
@@ -139,37 +540,48 @@ class SpeechRecognizer:
         self.is_recording = False  
         
         # Stop stream  
-        if hasattr(self, 'stream'):  
-            self.stream.stop()  
-            self.stream.close()  
+        if self.capture is not None:
+            self.capture.stop()
         
         # Wait for recognition thread  
-        if hasattr(self, 'recognition_thread'):  
-            self.recognition_thread.join()  
+        if self.decode_scheduler is not None:
+            self.decode_scheduler.stop()
         
+        # Short recordings end before the race does
+        if self.language_race is not None:
+            self.finish_language_race()
+
         # Export recording  
         self.export_recording()  
+        self.close_capture_buffer()
         
         # Get final result  
-        final_result = self.recognizer.FinalResult()  
+        final_result = self.session_result(self.recognizer.FinalResult())
+        self.publish_final(final_result)
         self.logger.info("Recording stopped")  
         return final_result  
 
     def export_recording(self):  
+        # Streamed recordings are already on disk, only the open file needs closing
+        if self.recorder is not None:
+            files = self.recorder.stop()
+            for path, start_sample, end_sample in self.recorder.file_ranges:
+                self.register_audio_file(path, start_sample, end_sample)
+            self.recorder = None
+            return files[-1] if files else None
+
         # Ensure recordings directory exists  
-        os.makedirs('recordings', exist_ok=True)  
+        os.makedirs(self.recordings_dir, exist_ok=True)
         
         # Generate unique filename  
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")  
-        filename = f"recordings/recording_{timestamp}.wav"  
+        filename = os.path.join(self.recordings_dir, f"recording_{timestamp}.wav")
         
         try:  
-            # Combine recorded audio  
-            if self.recorded_audio:  
-                recording = np.concatenate(self.recorded_audio, axis=0)  
-                
-                # Export to WAV  
-                sf.write(filename, recording, self.config['sample_rate'])  
+            if self.capture_buffer is not None and self.capture_buffer.frames_written:
+                # Export to WAV straight from the capture buffer
+                self.capture_buffer.export(filename, self.config['sample_rate'])
+                self.register_audio_file(filename, 0, self.capture_buffer.frames_written)
                 self.logger.info(f"Recording exported: {filename}")  
                 return filename  
         except Exception as e:  
@@ -179,113 +591,211 @@ class SpeechRecognizer:
     
     def start_continuous_transcription(self, device_index=None, model_name=None,   
                                        silence_threshold=0.01,   
-                                       silence_duration=1.0):  
+                                       silence_duration=1.0, grammar=None):  
         """  
         Start continuous transcription mode  
         - Automatically manages recording based on speech activity  
-        - Stops recording during prolonged silence  
+        - Only audio the VAD classifies as speech reaches the decoder
+        - silence_threshold seeds the VAD's adaptive noise floor
+        - silence_duration is the hangover before a segment is closed
         """  
         # Reset state  
         self.continuous_mode = True  
         self.silence_threshold = silence_threshold  
         self.silence_duration = silence_duration  
-        self.audio_queue = queue.Queue()  
-        self.text_queue = queue.Queue()  
-        self.recorded_audio = []  
-        self.last_speech_time = datetime.now()  
+        self.subscribe_consumers()
+        self.text_queue = self.create_text_queue()
+        self.create_capture_buffer()
+        self.vad = self.create_vad()
+        segments_config = self.config.get('segments', {})
+        self.live_partials = segments_config.get('live_partials', True)
 
         # Set language model if specified  
-        if model_name:  
-            model_path = self.available_models.get(model_name)  
-            if model_path:  
-                self.set_language_model(model_path)  
+        self.prepare_recognizer(model_name, grammar)
+        self.begin_session('continuous')
+        # Closed segments are finalized off the live decode thread
+        self.segment_pool = SegmentDecoderPool(
+            self.model_cache, self.model_path, self.config['sample_rate'],
+            self.publish_segment_final, workers=segments_config.get('workers'), grammar=self.grammar,
+            metrics=self.metrics)
 
         # Use specified device or default  
         device_index = device_index if device_index is not None else self.config['device_index']  
         
-        def audio_callback(indata, frames, time, status):  
-            if status:  
-                self.logger.warning(status)  
-            
-            # Calculate volume  
-            volume = self.calculate_volume(indata)  
-            
-            # Check for speech activity  
-            if volume > self.silence_threshold:  
-                self.last_speech_time = datetime.now()  
-                self.audio_queue.put(indata.copy())  
-                self.recorded_audio.append(indata.copy())  
-        
-        def continuous_recognition_thread():  
-            while self.continuous_mode:  
-                try:  
-                    # Check for silence duration  
-                    current_time = datetime.now()  
-                    silence_elapsed = (current_time - self.last_speech_time).total_seconds()  
-                    
-                    if silence_elapsed > self.silence_duration and self.recorded_audio:  
-                        # Process the recorded segment  
-                        self.process_audio_segment()  
-                        
-                        # Reset for next segment  
-                        self.recorded_audio = []  
-                    
-                    # Process available audio  
-                    if not self.audio_queue.empty():  
-                        data = self.audio_queue.get()  
-                        if self.recognizer.AcceptWaveform(data.tobytes()):  
-                            result = json.loads(self.recognizer.Result())  
-                            if 'text' in result and result['text'].strip():  
-                                self.text_queue.put(result['text'])  
-                    
-                    # Small sleep to prevent CPU overuse  
-                    threading.Event().wait(0.1)  
-                
-                except Exception as e:  
-                    self.logger.error(f"Continuous recognition error: {e}")  
-        
         try:  
-            # Start audio stream  
-            self.stream = sd.InputStream(  
-                samplerate=self.config['sample_rate'],   
-                channels=self.config['channels'],  
-                dtype='float32',  
-                callback=audio_callback,  
-                device=device_index  
-            )  
-            self.stream.start()  
+            # Start audio stream, everything is captured and the VAD decides what reaches the decoder
+            self.capture = self.create_capture_pipeline(device_index)
+            self.capture.start()
             
             # Start continuous recognition thread  
-            self.recognition_thread = threading.Thread(target=continuous_recognition_thread)  
-            self.recognition_thread.start()  
+            self.decode_scheduler = self.create_decode_scheduler(self.vad)
+            self.decode_scheduler.start()
             
             self.logger.info("Continuous transcription started")  
         
         except Exception as e:  
             self.logger.error(f"Continuous transcription start error: {e}")  
             self.continuous_mode = False  
+            # Left in place, later record sessions would treat their finals as pool-owned
+            self.segment_pool.close()
+            self.segment_pool = None
+
+    def start_multi_channel(self, inputs=None, model_name=None, workers=None):
+        """
+        Transcribe several devices/channels at once, each channel with its own results
+        - inputs defaults to config multi_channel.inputs, e.g. [{"device": 2, "channels": 4}]
+        - Returns the MultiChannelSession, subscribe to its channels by name
+        """
+        multi_config = self.config.get('multi_channel', {})
+        inputs = inputs or multi_config.get('inputs') or [
+            {'device': self.config['device_index'], 'channels': self.config['channels']}]
+        model_path = self.available_models.get(model_name) if model_name else None
+        session = MultiChannelSession(self, inputs, model_path=model_path,
+                                      workers=workers or multi_config.get('workers'))
+        session.start()
+        self.multi_channel_session = session
+        return session
 
-    def process_audio_segment(self):  
+    def stop_multi_channel(self):
+        session, self.multi_channel_session = self.multi_channel_session, None
+        if session is not None:
+            session.stop()
+        return session
+
+    def create_capture_pipeline(self, device_index):
+        return CapturePipeline(
+            self.capture_buffer,
+            self.audio_bus,
+            self.config['sample_rate'],
+            self.config['channels'],
+            self.config.get('chunk_size', 2048),
+            device=device_index,
+            metrics=self.metrics,
+            device_rate=self.device_sample_rate(device_index)
+        )
+
+    def device_sample_rate(self, device_index):
+        """Native rate of an input device, unless the config pins capture_rate to a number"""
+        capture_rate = self.config.get('capture_rate', 'native')
+        if capture_rate != 'native':
+            return int(capture_rate or self.config['sample_rate'])
+        try:
+            import sounddevice as sd
+            return int(sd.query_devices(device_index, 'input')['default_samplerate'])
+        except Exception as e:
+            self.logger.warning(f"Device sample rate unavailable, capturing at the model rate: {e}")
+            return self.config['sample_rate']
+
+    def create_vad(self):
+        vad_config = dict(self.config.get('vad', {}))
+        engine = vad_config.pop('engine', 'energy')
+        vad_config.setdefault('initial_floor_rms', self.silence_threshold)
+        vad_config.setdefault('hangover_ms', self.silence_duration * 1000)
+        return create_vad(engine, self.config['sample_rate'], **vad_config)
+
+    def create_decode_scheduler(self, vad=None):
+        # Segment boundaries are sample positions, shared with the capture buffer
+        return DecodeScheduler(
+            self.audio_queue,
+            self.decode_audio,
+            self.config['sample_rate'],
+            channels=self.config['channels'],
+            dtype=CAPTURE_DTYPE,
+            vad=vad,
+            on_segment_start=self.begin_segment,
+            on_segment_end=self.process_audio_segment,
+            max_batch_ms=self.config.get('decoder', {}).get('max_batch_ms', 200)
+        )
+
+    def decode_audio(self, data):
+        if self.language_race is not None:
+            # Not counted in fed_frames, the live recognizer only receives this audio in the replay
+            if self.language_race.feed(data):
+                self.finish_language_race()
+            return
+        if self.segment_pool is not None and not self.live_partials:
+            # Segments carry the audio to the pool, nothing to decode live
+            return
+        started = time.perf_counter()
+        accepted = self.recognizer.AcceptWaveform(data.tobytes())
+        self.fed_frames += len(data)
+        self.accept_waveform_seconds.observe(time.perf_counter() - started)
+        self.decoded_frames.inc(len(data))
+        if not accepted:
+            self.result_emitter.partial(self.recognizer)
+        elif self.segment_pool is None:
+            self.publish_final(self.session_result(self.recognizer.Result()))
+        # With a segment pool the live recognizer only drives partials, finals come from the pool
+
+    def session_result(self, raw_result):
+        # A reused recognizer's clock includes earlier sessions, word times restart at this session's start
+        if not self.recognizer_offset:
+            return raw_result
+        return json.dumps(shift_words(json.loads(raw_result), self.recognizer_offset / self.config['sample_rate']))
+
+    def publish_final(self, raw_result, start_sample=None, end_sample=None, word_offset=None):
+        final = self.result_emitter.final(raw_result)
+        if final is not None:
+            put_latest(self.text_queue, final.text)
+            self.store_final(final, start_sample, end_sample, word_offset)
+        return final
+
+    def publish_segment_final(self, segment, raw_result):
+        # Called by the segment pool in segment order, word times start at the segment start
+        final = self.result_emitter.final(raw_result)
+        if final is None:
+            return
+        put_latest(self.text_queue, final.text)
+        segment_id = self.store_final(final, segment.start, segment.end, word_offset=segment.start)
+        self.segment_finalize_seconds.observe(time.perf_counter() - segment.closed_at)
+        self.refine_segment(segment, segment_id)
+
+    def subscribe_results(self):
+        """
+        Subscribe to partial and final TranscriptResults
+        - Iterate (or `async for`) over the returned subscription, close() it when done
+        """
+        return self.results.subscribe()
+
+    def get_decode_metrics(self):
+        if self.decode_scheduler is None:
+            return {}
+        return self.decode_scheduler.metrics()
+
+    def process_audio_segment(self, segment_start=None, segment_end=None):
         """  
         Process a segment of recorded audio  
         - Export the segment  
-        - Perform final recognition  
+        - Hand a copy of its audio to the segment pool for final recognition
         """  
         try:  
-            if self.recorded_audio:  
-                # Combine recorded audio  
-                recording = np.concatenate(self.recorded_audio, axis=0)  
-                
+            if segment_start is None:
+                segment_start = self.segment_start
+            if segment_end is None:
+                segment_end = self.capture_buffer.frames_written
+            if segment_end > segment_start:
                 # Export segment  
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")  
-                segment_filename = f"recordings/segment_{timestamp}.wav"  
-                os.makedirs('recordings', exist_ok=True)  
-                sf.write(segment_filename, recording, self.config['sample_rate'])  
+                # Several segments can close within a second, the start sample keeps names unique
+                session = f"_{self.session_id[:8]}" if self.session_id else ''
+                segment_filename = os.path.join(self.recordings_dir,
+                                                f"segment_{timestamp}{session}_{segment_start}.wav")
+                os.makedirs(self.recordings_dir, exist_ok=True)
+                self.capture_buffer.export(segment_filename, self.config['sample_rate'],
+                                           segment_start, segment_end)
+                self.register_audio_file(segment_filename, segment_start, segment_end)
                 
-                # Perform final recognition on the segment  
-                final_result = self.recognizer.FinalResult()  
-                if final_result:  
-                    self.logger.info(f"Segment processed: {final_result}")  
+                # Perform final recognition on the segment, in parallel with capture
+                audio = np.concatenate(list(self.capture_buffer.iter_frames(segment_start, segment_end)))
+                if self.language_race is not None:
+                    # Held until the race has picked the model
+                    self.pending_segments.append((segment_start, segment_end, audio, segment_filename))
+                    self.logger.info(f"Segment held for language identification: {segment_start}-{segment_end}")
+                else:
+                    index = self.segment_pool.submit(segment_start, segment_end, audio, segment_filename)
+                    self.logger.info(f"Segment {index} queued: {segment_start}-{segment_end}")
+                # The live recognizer starts the next segment from scratch
+                self.recognizer.Reset()
         
         except Exception as e:  
             self.logger.error(f"Audio segment processing error: {e}")  
@@ -296,19 +806,22 @@ class SpeechRecognizer:
         - Process any remaining audio  
         - Stop threads and streams  
         """  
+        # Stop stream first so no audio arrives after the final drain
+        if self.capture is not None:
+            self.capture.stop()
         self.continuous_mode = False  
         
-        # Process final segment if any  
-        if self.recorded_audio:  
-            self.process_audio_segment()  
-        
-        # Stop stream  
-        if hasattr(self, 'stream'):  
-            self.stream.stop()  
-            self.stream.close()  
-        
-        # Wait for recognition thread  
-        if hasattr(self, 'recognition_thread'):  
-            self.recognition_thread.join()  
+        # Wait for recognition thread, it processes the final segment if any
+        if self.decode_scheduler is not None:
+            self.decode_scheduler.stop()
+
+        if self.language_race is not None:
+            self.finish_language_race()
+
+        # Publish every queued segment before returning
+        if self.segment_pool is not None:
+            self.segment_pool.close()
+            self.segment_pool = None
         
+        self.close_capture_buffer()
         self.logger.info("Continuous transcription stopped")     
\ No newline at end of file
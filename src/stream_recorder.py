@@ -0,0 +1,120 @@
+import os
+import threading
+import logging
+from datetime import datetime
+
+FILE_EXTENSIONS = {'WAV': '.wav', 'FLAC': '.flac', 'OGG': '.ogg'}
+DEFAULT_SUBTYPES = {'WAV': 'PCM_16', 'FLAC': 'PCM_16', 'OGG': 'VORBIS'}
+
+
+class StreamingRecorder:
+    """
+    Writes captured audio to disk while recording
+    - A background thread appends new ring buffer frames to an open SoundFile
+    - Files rotate after a configurable duration or size
+    - Stopping only flushes the frames captured since the last write
+    """
+    def __init__(self, ring, samplerate, directory='recordings', prefix='recording',
+                 file_format='WAV', subtype=None, rotate_seconds=None, rotate_megabytes=None,
+                 poll_interval=0.2):
+        self.logger = logging.getLogger(__name__)
+        self.ring = ring
+        self.samplerate = samplerate
+        self.directory = directory
+        self.prefix = prefix
+        self.file_format = file_format.upper()
+        if self.file_format not in FILE_EXTENSIONS:
+            raise ValueError(f"Unsupported recording format: {file_format}")
+        self.subtype = subtype or DEFAULT_SUBTYPES[self.file_format]
+        self.rotate_frames = int(rotate_seconds * samplerate) if rotate_seconds else None
+        self.rotate_bytes = int(rotate_megabytes * 1024 * 1024) if rotate_megabytes else None
+        self.poll_interval = poll_interval
+
+        self.files = []
+        # [filename, first frame, end frame] on the ring buffer's frame clock
+        self.file_ranges = []
+        self.cursor = ring.frames_written
+        self._position = self.cursor
+        self.lost_frames = 0
+        self._file = None
+        self._file_frames = 0
+        self._timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='stream-recorder', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the writer thread, close the open file and return every file written"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._close_file()
+        return list(self.files)
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            self._write_pending()
+        # Capture has stopped by now, write whatever is left
+        self._write_pending()
+
+    def _write_pending(self):
+        try:
+            written = self.ring.frames_written
+            oldest = self.ring.oldest_frame
+            if self.cursor < oldest:
+                self.lost_frames += oldest - self.cursor
+                self.logger.warning(f"Recorder fell behind, {oldest - self.cursor} frames lost")
+                self.cursor = oldest
+            self._position = self.cursor
+            for view in self.ring.read(self.cursor, written):
+                self._write(view)
+            self.cursor = written
+        except Exception as e:
+            self.logger.error(f"Streaming recorder error: {e}")
+
+    def _write(self, frames):
+        while len(frames):
+            if self._file is None or self._needs_rotation():
+                self._open_next_file()
+            count = len(frames)
+            if self.rotate_frames:
+                count = min(count, self.rotate_frames - self._file_frames)
+            self._file.write(frames[:count])
+            self._file_frames += count
+            self._position += count
+            self.file_ranges[-1][2] = self._position
+            frames = frames[count:]
+
+    def _needs_rotation(self):
+        if self.rotate_frames and self._file_frames >= self.rotate_frames:
+            return True
+        if self.rotate_bytes and os.path.getsize(self._file.name) >= self.rotate_bytes:
+            return True
+        return False
+
+    def _open_next_file(self):
+        self._close_file()
+        part = f"_{len(self.files) + 1:03d}" if (self.rotate_frames or self.rotate_bytes) else ""
+        filename = os.path.join(
+            self.directory,
+            f"{self.prefix}_{self._timestamp}{part}{FILE_EXTENSIONS[self.file_format]}"
+        )
+        import soundfile as sf
+        self._file = sf.SoundFile(filename, 'w', samplerate=self.samplerate,
+                                  channels=self.ring.channels, format=self.file_format,
+                                  subtype=self.subtype)
+        self._file_frames = 0
+        self.files.append(filename)
+        self.file_ranges.append([filename, self._position, self._position])
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self.logger.info(f"Recording written: {self._file.name}")
+            self._file = None
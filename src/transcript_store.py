@@ -0,0 +1,236 @@
+import os
+import time
+import uuid
+import sqlite3
+import threading
+import logging
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    started_at REAL NOT NULL,
+    mode TEXT,
+    model TEXT,
+    sample_rate INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS segments (
+    id INTEGER PRIMARY KEY,
+    session_id TEXT NOT NULL REFERENCES sessions(id),
+    text TEXT NOT NULL,
+    start_sample INTEGER,
+    end_sample INTEGER,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS segments_session_time ON segments(session_id, start_sample);
+CREATE TABLE IF NOT EXISTS words (
+    segment_id INTEGER NOT NULL REFERENCES segments(id),
+    word TEXT NOT NULL,
+    start_sample INTEGER NOT NULL,
+    end_sample INTEGER NOT NULL,
+    confidence REAL
+);
+CREATE INDEX IF NOT EXISTS words_segment ON words(segment_id);
+CREATE TABLE IF NOT EXISTS audio_files (
+    session_id TEXT NOT NULL REFERENCES sessions(id),
+    path TEXT NOT NULL,
+    start_sample INTEGER NOT NULL,
+    end_sample INTEGER
+);
+CREATE INDEX IF NOT EXISTS audio_files_session_start ON audio_files(session_id, start_sample);
+CREATE TABLE IF NOT EXISTS revisions (
+    segment_id INTEGER NOT NULL REFERENCES segments(id),
+    previous_text TEXT NOT NULL,
+    model TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS revisions_segment ON revisions(segment_id);
+"""
+
+# Segment rowids double as FTS rowids, the index only stores tokens
+FTS_SCHEMA = "CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts USING fts5(text, content='segments', content_rowid='id')"
+
+
+def quote_terms(query):
+    """Plain words as an FTS5 query, each term quoted so apostrophes and hyphens are not syntax"""
+    return ' '.join('"' + term.replace('"', '""') + '"' for term in query.split())
+
+
+class TranscriptStore:
+    """
+    Append-only SQLite store for final transcripts
+    - Positions are sample indexes on each session's capture clock
+    - Segments are indexed by (session, start sample) and by FTS5 full text
+    - Audio files are registered with the sample range they cover, so a hit resolves to a file offset
+    - Segment text can be replaced by a later pass, the superseded text is kept in revisions
+    """
+    def __init__(self, path='transcripts/transcripts.db'):
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # Writes come from the decode thread, reads from the UI/CLI, one connection behind a lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            if path != ':memory:':
+                self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.executescript(SCHEMA)
+            try:
+                self._conn.execute(FTS_SCHEMA)
+                self.full_text = True
+            except sqlite3.OperationalError as e:
+                # SQLite built without FTS5, search falls back to LIKE scans
+                self.logger.warning(f"FTS5 unavailable, using LIKE search: {e}")
+                self.full_text = False
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def start_session(self, sample_rate, mode=None, model=None):
+        session_id = uuid.uuid4().hex
+        with self._lock, self._conn:
+            self._conn.execute('INSERT INTO sessions (id, started_at, mode, model, sample_rate) VALUES (?, ?, ?, ?, ?)',
+                               (session_id, time.time(), mode, model, sample_rate))
+        return session_id
+
+    def set_session_model(self, session_id, model):
+        with self._lock, self._conn:
+            self._conn.execute('UPDATE sessions SET model = ? WHERE id = ?', (model, session_id))
+
+    def add_segment(self, session_id, text, start_sample=None, end_sample=None, words=()):
+        """
+        Append one final result
+        - words is a list of (word, start_sample, end_sample, confidence)
+        """
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                'INSERT INTO segments (session_id, text, start_sample, end_sample, created_at) VALUES (?, ?, ?, ?, ?)',
+                (session_id, text, start_sample, end_sample, time.time()))
+            segment_id = cursor.lastrowid
+            if words:
+                self._conn.executemany(
+                    'INSERT INTO words (segment_id, word, start_sample, end_sample, confidence) VALUES (?, ?, ?, ?, ?)',
+                    [(segment_id,) + tuple(word) for word in words])
+            if self.full_text:
+                self._conn.execute('INSERT INTO segments_fts (rowid, text) VALUES (?, ?)', (segment_id, text))
+        return segment_id
+
+    def replace_segment(self, segment_id, text, words=(), model=None):
+        """Replace a segment's text and words, e.g. with a rescoring result"""
+        with self._lock, self._conn:
+            row = self._conn.execute('SELECT text FROM segments WHERE id = ?', (segment_id,)).fetchone()
+            if row is None:
+                return False
+            self._conn.execute('INSERT INTO revisions (segment_id, previous_text, model, created_at) VALUES (?, ?, ?, ?)',
+                               (segment_id, row['text'], model, time.time()))
+            if self.full_text:
+                self._conn.execute("INSERT INTO segments_fts (segments_fts, rowid, text) VALUES ('delete', ?, ?)",
+                                   (segment_id, row['text']))
+                self._conn.execute('INSERT INTO segments_fts (rowid, text) VALUES (?, ?)', (segment_id, text))
+            self._conn.execute('UPDATE segments SET text = ? WHERE id = ?', (text, segment_id))
+            self._conn.execute('DELETE FROM words WHERE segment_id = ?', (segment_id,))
+            if words:
+                self._conn.executemany(
+                    'INSERT INTO words (segment_id, word, start_sample, end_sample, confidence) VALUES (?, ?, ?, ?, ?)',
+                    [(segment_id,) + tuple(word) for word in words])
+        return True
+
+    def revisions(self, segment_id):
+        return self._query('SELECT previous_text, model, created_at FROM revisions WHERE segment_id = ? '
+                           'ORDER BY created_at', (segment_id,))
+
+    def add_audio_file(self, session_id, path, start_sample, end_sample=None):
+        with self._lock, self._conn:
+            self._conn.execute('INSERT INTO audio_files (session_id, path, start_sample, end_sample) VALUES (?, ?, ?, ?)',
+                               (session_id, path, start_sample, end_sample))
+
+    def _query(self, sql, parameters=()):
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, parameters)]
+
+    def sessions(self):
+        return self._query('SELECT * FROM sessions ORDER BY started_at')
+
+    def locate(self, session_id, sample):
+        """Audio file holding a sample and the sample's offset within it, or (None, None)"""
+        rows = self._query(
+            'SELECT path, start_sample FROM audio_files WHERE session_id = ? AND start_sample <= ? '
+            'AND (end_sample IS NULL OR end_sample > ?) ORDER BY start_sample DESC LIMIT 1',
+            (session_id, sample, sample))
+        if not rows:
+            return None, None
+        return rows[0]['path'], sample - rows[0]['start_sample']
+
+    def _with_audio(self, rows):
+        for row in rows:
+            if row.get('start_sample') is None:
+                row['audio_file'], row['file_offset'] = None, None
+            else:
+                row['audio_file'], row['file_offset'] = self.locate(row['session_id'], row['start_sample'])
+            rate = row.get('sample_rate')
+            if rate and row.get('start_sample') is not None:
+                row['start_time'] = row['start_sample'] / rate
+                row['end_time'] = row['end_sample'] / rate if row['end_sample'] is not None else None
+        return rows
+
+    def search(self, query, session_id=None, limit=50, raw=False):
+        """
+        Full-text search over final segments, best matches first
+        - Words are matched as given (all of them), raw=True passes FTS5 query syntax through
+        - Each hit carries its sample range plus audio_file/file_offset to seek to
+        - Invalid raw queries raise ValueError
+        """
+        session_filter = ' AND s.session_id = ?' if session_id else ''
+        if self.full_text:
+            if not raw:
+                query = quote_terms(query)
+                if not query:
+                    return []
+            sql = ('SELECT s.id AS segment_id, s.session_id, s.text, s.start_sample, s.end_sample, '
+                   "x.sample_rate, snippet(segments_fts, 0, '[', ']', '...', 12) AS snippet "
+                   'FROM segments_fts JOIN segments s ON s.id = segments_fts.rowid '
+                   'JOIN sessions x ON x.id = s.session_id '
+                   f'WHERE segments_fts MATCH ?{session_filter} ORDER BY rank LIMIT ?')
+        else:
+            query = f'%{query}%'
+            sql = ('SELECT s.id AS segment_id, s.session_id, s.text, s.start_sample, s.end_sample, '
+                   'x.sample_rate, s.text AS snippet FROM segments s JOIN sessions x ON x.id = s.session_id '
+                   f'WHERE s.text LIKE ?{session_filter} ORDER BY s.id LIMIT ?')
+        parameters = (query, session_id, limit) if session_id else (query, limit)
+        try:
+            return self._with_audio(self._query(sql, parameters))
+        except sqlite3.OperationalError as e:
+            raise ValueError(f"Invalid search query {query!r}: {e}")
+
+    def segments_between(self, session_id, start_time, end_time):
+        """Segments of a session overlapping [start_time, end_time) seconds"""
+        rate = self._sample_rate(session_id)
+        if rate is None:
+            return []
+        return self._with_audio(self._query(
+            'SELECT s.id AS segment_id, s.session_id, s.text, s.start_sample, s.end_sample, x.sample_rate '
+            'FROM segments s JOIN sessions x ON x.id = s.session_id '
+            'WHERE s.session_id = ? AND s.start_sample < ? AND s.end_sample > ? ORDER BY s.start_sample',
+            (session_id, int(end_time * rate), int(start_time * rate))))
+
+    def words_between(self, session_id, start_time, end_time):
+        rate = self._sample_rate(session_id)
+        if rate is None:
+            return []
+        return self._query(
+            'SELECT w.word, w.start_sample, w.end_sample, w.confidence, w.segment_id '
+            'FROM segments s JOIN words w ON w.segment_id = s.id '
+            'WHERE s.session_id = ? AND s.start_sample < ? AND s.end_sample > ? '
+            'AND w.start_sample < ? AND w.end_sample > ? ORDER BY w.start_sample',
+            (session_id, int(end_time * rate), int(start_time * rate),
+             int(end_time * rate), int(start_time * rate)))
+
+    def words(self, segment_id):
+        return self._query('SELECT word, start_sample, end_sample, confidence FROM words '
+                           'WHERE segment_id = ? ORDER BY start_sample', (segment_id,))
+
+    def _sample_rate(self, session_id):
+        rows = self._query('SELECT sample_rate FROM sessions WHERE id = ?', (session_id,))
+        return rows[0]['sample_rate'] if rows else None
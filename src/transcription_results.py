@@ -0,0 +1,192 @@
+import json
+import time
+import queue
+import asyncio
+import threading
+from collections import namedtuple
+
+PARTIAL = 'partial'
+FINAL = 'final'
+
+# Times are in seconds on the recognizer's clock, confidence is only set for final words
+WordTiming = namedtuple('WordTiming', ['word', 'start', 'end', 'confidence'])
+TranscriptResult = namedtuple('TranscriptResult', ['kind', 'text', 'words', 'start', 'end'])
+
+_CLOSED = object()
+
+
+def parse_words(entries):
+    return [WordTiming(entry['word'], entry['start'], entry['end'], entry.get('conf'))
+            for entry in entries or []]
+
+
+def put_latest(text_queue, text):
+    """Put without blocking on a bounded queue, dropping the oldest text when nobody drains it"""
+    while True:
+        try:
+            text_queue.put_nowait(text)
+            return
+        except queue.Full:
+            try:
+                text_queue.get_nowait()
+            except queue.Empty:
+                pass
+
+
+def make_result(kind, text, words):
+    start = words[0].start if words else None
+    end = words[-1].end if words else None
+    return TranscriptResult(kind, text, words, start, end)
+
+
+class ResultSubscription:
+    """
+    Consumer side of a ResultStream
+    - get() mirrors queue.Queue, iteration blocks until the subscription is closed
+    - Also usable with `async for` by non-GUI consumers, results are then handed to the event
+      loop with call_soon_threadsafe instead of parking an executor thread on a blocking get
+    """
+    def __init__(self, stream):
+        self._stream = stream
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._loop = None
+        self._async_queue = None
+
+    def put(self, result):
+        with self._lock:
+            if self._async_queue is not None:
+                try:
+                    self._loop.call_soon_threadsafe(self._deliver, self._async_queue, result)
+                    return
+                except RuntimeError:
+                    pass  # Event loop already closed
+            self._queue.put(result)
+
+    def _deliver(self, async_queue, result):
+        # Runs on the event loop, results arriving after the async consumer left go to the blocking queue
+        if self._async_queue is async_queue:
+            async_queue.put_nowait(result)
+        else:
+            self._queue.put(result)
+
+    def get(self, timeout=None):
+        result = self._queue.get(timeout=timeout)
+        if result is _CLOSED:
+            # Keep the marker so every later get/iteration also sees the end
+            self._queue.put(_CLOSED)
+            raise queue.Empty
+        return result
+
+    def drain(self):
+        """Remove and return every result queued so far, without blocking"""
+        results = []
+        while True:
+            try:
+                result = self._queue.get_nowait()
+            except queue.Empty:
+                return results
+            if result is _CLOSED:
+                self._queue.put(_CLOSED)
+                return results
+            results.append(result)
+
+    def __iter__(self):
+        while True:
+            result = self._queue.get()
+            if result is _CLOSED:
+                self._queue.put(_CLOSED)
+                return
+            yield result
+
+    async def __aiter__(self):
+        async_queue = asyncio.Queue()
+        with self._lock:
+            # Results queued before iteration started come first
+            while True:
+                try:
+                    async_queue.put_nowait(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._loop, self._async_queue = asyncio.get_running_loop(), async_queue
+        try:
+            while True:
+                result = await async_queue.get()
+                if result is _CLOSED:
+                    async_queue.put_nowait(_CLOSED)
+                    return
+                yield result
+        finally:
+            # Cancelled or left early: whatever is still queued goes back for get()/iteration
+            with self._lock:
+                self._loop, self._async_queue = None, None
+                while not async_queue.empty():
+                    self._queue.put(async_queue.get_nowait())
+
+    def close(self):
+        self._stream.unsubscribe(self)
+        self.put(_CLOSED)
+
+
+class ResultStream:
+    """Fan-out of TranscriptResults to any number of subscribers"""
+    def __init__(self):
+        self._subscriptions = ()
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        subscription = ResultSubscription(self)
+        with self._lock:
+            self._subscriptions += (subscription,)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions = tuple(s for s in self._subscriptions if s is not subscription)
+
+    def publish(self, result):
+        for subscription in self._subscriptions:
+            subscription.put(result)
+
+    def close(self):
+        for subscription in self._subscriptions:
+            subscription.close()
+
+
+class ResultEmitter:
+    """
+    Turns recognizer output into TranscriptResults on a ResultStream
+    - Partials are polled at most once per min_partial_interval and only published when the text changes
+    - Finals carry word timings and confidences (requires SetWords on the recognizer)
+    """
+    def __init__(self, stream, min_partial_interval=0.1):
+        self.stream = stream
+        self.min_partial_interval = min_partial_interval
+        self._last_partial = ''
+        self._last_poll = 0.0
+
+    def partial(self, recognizer):
+        now = time.monotonic()
+        if now - self._last_poll < self.min_partial_interval:
+            return None
+        self._last_poll = now
+
+        result = json.loads(recognizer.PartialResult())
+        text = result.get('partial', '')
+        if text == self._last_partial:
+            return None
+        self._last_partial = text
+        partial = make_result(PARTIAL, text, parse_words(result.get('partial_result')))
+        self.stream.publish(partial)
+        return partial
+
+    def final(self, raw_result):
+        """Publish a Result()/FinalResult() JSON string, return the result or None when empty"""
+        self._last_partial = ''
+        result = json.loads(raw_result)
+        text = result.get('text', '')
+        if not text.strip():
+            return None
+        final = make_result(FINAL, text, parse_words(result.get('result')))
+        self.stream.publish(final)
+        return final
@@ -0,0 +1,161 @@
+"""
+Headless transcription server
+
+Protocol (one session per TCP connection):
+- The client sends one JSON header line, e.g. {"model": "English (US)", "sample_rate": 16000}
+  Both keys are optional, the defaults come from the SpeechRecognizer config
+- The server replies {"type": "ready"}, or {"type": "error", "error": "busy"} when saturated
+- The client then streams raw 16-bit little-endian mono PCM and half-closes the socket when done
+- The server answers with JSON lines: {"type": "partial", ...}, {"type": "final", ...}
+  and {"type": "error", "error": ...}, then closes the connection
+"""
+import os
+import json
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from transcription_results import ResultStream, ResultEmitter, FINAL
+
+
+def result_to_message(result):
+    return {
+        'type': result.kind,
+        'text': result.text,
+        'words': [word._asdict() for word in result.words],
+        'start': result.start,
+        'end': result.end,
+    }
+
+
+class ServerSession:
+    """Recognizer state for one connection, only ever used by one decode thread at a time"""
+    def __init__(self, recognizer, min_partial_interval):
+        self.recognizer = recognizer
+        self.recognizer.SetWords(True)
+        self.emitter = ResultEmitter(ResultStream(), min_partial_interval)
+        self._odd_byte = b''
+
+    def accept(self, data):
+        data = self._odd_byte + data
+        # Keep whole 16-bit samples only, carry an odd trailing byte to the next chunk
+        if len(data) % 2:
+            data, self._odd_byte = data[:-1], data[-1:]
+        else:
+            self._odd_byte = b''
+        if self.recognizer.AcceptWaveform(data):
+            return self.emitter.final(self.recognizer.Result())
+        return self.emitter.partial(self.recognizer)
+
+    def finish(self):
+        return self.emitter.final(self.recognizer.FinalResult())
+
+
+class TranscriptionServer:
+    """
+    Local TCP server streaming PCM in and partial/final JSON out
+    - Sessions share the SpeechRecognizer's cached models
+    - Decoding runs on a bounded thread pool (Vosk releases the GIL while decoding)
+    - Connections beyond max_sessions are rejected with a "busy" error
+    """
+    def __init__(self, speech_recognizer, host='127.0.0.1', port=2700, max_sessions=None,
+                 decode_workers=None, chunk_bytes=8000):
+        self.logger = logging.getLogger(__name__)
+        self.speech_recognizer = speech_recognizer
+        self.host = host
+        self.port = port
+        cores = os.cpu_count() or 1
+        self.decode_workers = decode_workers or cores
+        self.max_sessions = max_sessions or self.decode_workers
+        self.chunk_bytes = chunk_bytes
+        self.active_sessions = 0
+        self.rejected_sessions = 0
+        self.executor = ThreadPoolExecutor(max_workers=self.decode_workers, thread_name_prefix='decode')
+        self.server = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        # Port 0 picks a free port, report the real one
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.logger.info(f"Transcription server listening on {self.host}:{self.port}")
+        return self.server
+
+    async def serve_forever(self):
+        if self.server is None:
+            await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        self.executor.shutdown(wait=True)
+
+    def run(self):
+        asyncio.run(self.serve_forever())
+
+    def resolve_model_path(self, model_name):
+        if not model_name:
+            return self.speech_recognizer.config['model_path']
+        model_path = self.speech_recognizer.available_models.get(model_name)
+        if model_path is None:
+            raise ValueError(f"Unknown model: {model_name}")
+        return model_path
+
+    async def handle_connection(self, reader, writer):
+        # Admission control, decode threads are a fixed budget shared by all sessions
+        if self.active_sessions >= self.max_sessions:
+            self.rejected_sessions += 1
+            await self.send(writer, {'type': 'error', 'error': 'busy'})
+            await self.close_writer(writer)
+            return
+
+        self.active_sessions += 1
+        loop = asyncio.get_running_loop()
+        try:
+            header = json.loads((await reader.readline()) or b'{}')
+            model_path = self.resolve_model_path(header.get('model'))
+            sample_rate = header.get('sample_rate', self.speech_recognizer.config['sample_rate'])
+
+            # Model loads go through the cache, off the event loop
+            recognizer = await loop.run_in_executor(
+                self.executor, self.speech_recognizer.model_cache.create_recognizer, model_path, sample_rate)
+            partial_interval = self.speech_recognizer.config.get('results', {}).get('partial_interval_ms', 100)
+            session = ServerSession(recognizer, partial_interval / 1000)
+            await self.send(writer, {'type': 'ready'})
+
+            while True:
+                data = await reader.read(self.chunk_bytes)
+                if not data:
+                    break
+                # Awaiting the decode before reading more gives TCP backpressure per client
+                result = await loop.run_in_executor(self.executor, session.accept, data)
+                if result is not None:
+                    await self.send(writer, result_to_message(result))
+
+            result = await loop.run_in_executor(self.executor, session.finish)
+            if result is not None and result.kind == FINAL:
+                await self.send(writer, result_to_message(result))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as e:
+            self.logger.error(f"Server session error: {e}")
+            try:
+                await self.send(writer, {'type': 'error', 'error': str(e)})
+            except ConnectionError:
+                pass
+        finally:
+            self.active_sessions -= 1
+            await self.close_writer(writer)
+
+    async def send(self, writer, message):
+        writer.write((json.dumps(message, ensure_ascii=False) + '\n').encode('utf-8'))
+        await writer.drain()
+
+    async def close_writer(self, writer):
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
@@ -1,35 +1,30 @@
 import sys  
+import time
+import queue
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QPushButton, QVBoxLayout,   
-                             QHBoxLayout, QTextEdit, QComboBox, QWidget, QLabel, QCheckBox)  
-from PyQt5.QtCore import Qt, QThread, pyqtSignal  
-from speech_recognizer import SpeechRecognizer  
+                             QHBoxLayout, QPlainTextEdit, QComboBox, QWidget, QLabel,   
+                             QProgressBar, QCheckBox)  
+from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer  
+from speech_recognizer import SpeechRecognizer, AUTO_LANGUAGE
+from transcription_results import FINAL
 
-class TextUpdateThread(QThread):  
-    text_update = pyqtSignal(str)  
-    
-    def __init__(self, speech_recognizer):  
-        super().__init__()  
-        self.speech_recognizer = speech_recognizer  
-        self.running = True  
-    
-    def run(self):  
-        while self.running:  
-            try:  
-                text = self.speech_recognizer.text_queue.get(timeout=0.1)  
-                self.text_update.emit(text)  
-            except:  
-                continue  
-    
-    def stop(self):  
-        self.running = False  
+class StartupThread(QThread):
+    """Runs SpeechRecognizer.initialize() so the window is usable while models load"""
+    progress = pyqtSignal(str, int)
+    ready = pyqtSignal()
+    failed = pyqtSignal(str)
 
-import sys  
-import numpy as np  
-from PyQt5.QtWidgets import (QApplication, QMainWindow, QPushButton, QVBoxLayout,   
-                             QHBoxLayout, QTextEdit, QComboBox, QWidget, QLabel,   
-                             QProgressBar)  
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer  
-from speech_recognizer import SpeechRecognizer  
+    def __init__(self, speech_recognizer):
+        super().__init__()
+        self.speech_recognizer = speech_recognizer
+
+    def run(self):
+        try:
+            self.speech_recognizer.initialize(
+                lambda message, fraction: self.progress.emit(message, int(fraction * 100)))
+            self.ready.emit()
+        except Exception as e:
+            self.failed.emit(str(e))
 
 class VolumeThread(QThread):  
     volume_update = pyqtSignal(float)  
@@ -41,12 +36,15 @@ class VolumeThread(QThread):
     
     def run(self):  
         while self.running:  
-            try:  
-                # Get latest audio data for volume calculation  
-                if not self.speech_recognizer.audio_queue.empty():  
-                    audio_data = self.speech_recognizer.audio_queue.get()  
-                    volume = self.speech_recognizer.calculate_volume(audio_data)  
-                    self.volume_update.emit(volume * 100)  # Scale for progress bar  
+            try:
+                # Block for the next level, then skip to the most recent one
+                level = self.speech_recognizer.level_queue.get(timeout=0.1)
+                pending = self.speech_recognizer.level_queue.drain()
+                if pending:
+                    level = pending[-1]
+                self.volume_update.emit(level.rms * 100)  # Scale for progress bar
+            except queue.Empty:
+                continue
             except Exception as e:  
                 print(f"Volume thread error: {e}")  
                 
@@ -59,8 +57,8 @@ class SpeechToTextApp(QMainWindow):
         self.setWindowTitle('Advanced Speech-to-Text Application')  
         self.setGeometry(100, 100, 700, 500)  
         
-        # Initialize speech recognizer  
-        self.speech_recognizer = SpeechRecognizer()  
+        # Initialize speech recognizer, devices and the model load after the window is shown
+        self.speech_recognizer = SpeechRecognizer(defer_init=True)
         
         # Create central widget and layout  
         central_widget = QWidget()  
@@ -70,13 +68,18 @@ class SpeechToTextApp(QMainWindow):
         model_layout = QHBoxLayout()  
         self.model_combo = QComboBox()  
         self.model_combo.addItems(self.speech_recognizer.get_available_models())  
+        self.model_combo.addItem(AUTO_LANGUAGE)
         model_layout.addWidget(QLabel('Select Language Model:'))  
         model_layout.addWidget(self.model_combo)  
+        self.grammar_combo = QComboBox()
+        self.grammar_combo.addItem('Open vocabulary')
+        self.grammar_combo.addItems(self.speech_recognizer.get_grammars())
+        model_layout.addWidget(QLabel('Vocabulary:'))
+        model_layout.addWidget(self.grammar_combo)
         
         # Device selection  
         device_layout = QHBoxLayout()  
         self.device_combo = QComboBox()  
-        self.device_combo.addItems(self.speech_recognizer.get_audio_devices())  
         device_layout.addWidget(QLabel('Select Audio Device:'))  
         device_layout.addWidget(self.device_combo)  
         
@@ -89,14 +92,32 @@ class SpeechToTextApp(QMainWindow):
         volume_layout.addWidget(self.mic_volume_bar)  
         
         # Text display area  
-        self.text_display = QTextEdit()  
+        # Capped to the most recent lines, the full history lives in the transcript store
+        ui_config = self.speech_recognizer.config.get('ui', {})
+        self.text_display = QPlainTextEdit()  
         self.text_display.setReadOnly(True)  
+        self.text_display.setMaximumBlockCount(ui_config.get('max_lines', 2000))
+
+        # Current partial hypothesis, replaced by the final text
+        self.partial_label = QLabel('')
+        self.partial_label.setStyleSheet('color: gray; font-style: italic;')
+        self.partial_label.setWordWrap(True)
+
+        # Live pipeline stats, refreshed from the metrics registry
+        self.stats_label = QLabel('')
+        self.stats_label.setStyleSheet('color: gray; font-size: 10px;')
         
         # Control buttons  
         button_layout = QHBoxLayout()  
         self.start_button = QPushButton('Start Recording')  
         self.stop_button = QPushButton('Stop Recording')  
         self.stop_button.setEnabled(False)  
+        self.start_button.setEnabled(False)
+
+        # Startup progress, hidden once the model is loaded
+        self.startup_progress = QProgressBar()
+        self.startup_progress.setMaximumWidth(200)
+        self.statusBar().addPermanentWidget(self.startup_progress)
         
         button_layout.addWidget(self.start_button)  
         button_layout.addWidget(self.stop_button)  
@@ -106,7 +127,9 @@ class SpeechToTextApp(QMainWindow):
         main_layout.addLayout(device_layout)  
         main_layout.addLayout(volume_layout)  
         main_layout.addWidget(self.text_display)  
+        main_layout.addWidget(self.partial_label)
         main_layout.addLayout(button_layout)  
+        main_layout.addWidget(self.stats_label)
         
         central_widget.setLayout(main_layout)  
         self.setCentralWidget(central_widget)  
@@ -116,16 +139,52 @@ class SpeechToTextApp(QMainWindow):
         self.stop_button.clicked.connect(self.stop_recording)  
         
         # Threads  
-        self.text_update_thread = None  
+        self.results = None
         self.volume_thread = None  
         # Add continuous transcription checkbox  
         self.continuous_mode_checkbox = QCheckBox('Continuous Transcription')  
         button_layout.addWidget(self.continuous_mode_checkbox)      
+
+        self.stats_timer = QTimer(self)
+        self.stats_timer.timeout.connect(self.update_stats)
+        self.stats_timer.start(1000)
+
+        # Results are drained and rendered in batches, not one signal per result
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setInterval(ui_config.get('flush_interval_ms', 100))
+        self.flush_timer.timeout.connect(self.flush_transcript)
+
+        self.startup_thread = StartupThread(self.speech_recognizer)
+        self.startup_thread.progress.connect(self.update_startup_progress)
+        self.startup_thread.ready.connect(self.startup_finished)
+        self.startup_thread.failed.connect(self.startup_failed)
+
+    def start_initialization(self):
+        self.startup_thread.start()
+
+    def update_startup_progress(self, message, percent):
+        self.statusBar().showMessage(message)
+        self.startup_progress.setValue(percent)
+
+    def startup_finished(self):
+        self.device_combo.addItems(self.speech_recognizer.get_audio_devices())
+        self.start_button.setEnabled(True)
+        self.startup_progress.hide()
+        timings = self.speech_recognizer.startup_timings
+        self.statusBar().showMessage(
+            "Ready (" + ", ".join(f"{phase} {seconds:.2f}s" for phase, seconds in timings.items()) + ")", 10000)
+
+    def startup_failed(self, message):
+        self.startup_progress.hide()
+        self.statusBar().showMessage('Model loading failed')
+        self.show_error(f"Startup error: {message}")
         
     def start_recording(self):  
         try:  
             device_index = self.device_combo.currentIndex()  
             model_name = self.model_combo.currentText()  
+            # Index 0 is open vocabulary, '' overrides a configured default grammar
+            grammar = self.grammar_combo.currentText() if self.grammar_combo.currentIndex() > 0 else ''
             
             # Check if continuous mode is enabled  
             if self.continuous_mode_checkbox.isChecked():  
@@ -133,19 +192,20 @@ class SpeechToTextApp(QMainWindow):
                     device_index,   
                     model_name,  
                     silence_threshold=0.01,  # Adjustable   
-                    silence_duration=1.0     # Adjustable  
+                    silence_duration=1.0,    # Adjustable  
+                    grammar=grammar
                 )  
             else:  
                 # Regular recording mode  
                 self.speech_recognizer.start_recording(  
                     device_index,   
-                    model_name  
+                    model_name,
+                    grammar=grammar
                 )  
             
             # Start text update thread (same as before)  
-            self.text_update_thread = TextUpdateThread(self.speech_recognizer)  
-            self.text_update_thread.text_update.connect(self.update_text_display)  
-            self.text_update_thread.start()  
+            self.results = self.speech_recognizer.subscribe_results()
+            self.flush_timer.start()
             
             # Start volume thread (same as before)  
             self.volume_thread = VolumeThread(self.speech_recognizer)  
@@ -168,9 +228,12 @@ class SpeechToTextApp(QMainWindow):
                 self.speech_recognizer.stop_recording()  
             
             # Stop threads (same as before)  
-            if self.text_update_thread:  
-                self.text_update_thread.stop()  
-                self.text_update_thread.wait()  
+            if self.results is not None:
+                self.flush_timer.stop()
+                # Render the final result published by the stop call
+                self.flush_transcript()
+                self.results.close()
+                self.results = None
             
             if self.volume_thread:  
                 self.volume_thread.stop()  
@@ -180,16 +243,61 @@ class SpeechToTextApp(QMainWindow):
             self.start_button.setEnabled(True)  
             self.stop_button.setEnabled(False)  
             self.mic_volume_bar.setValue(0)  
+            self.partial_label.setText('')
         
         except Exception as e:  
             self.show_error(f"Recording stop error: {e}")  
     
+    def flush_transcript(self):
+        """
+        Render everything that arrived since the last tick
+        - All finals go in with one append, only the latest partial is shown
+        - Cost per tick depends on the new text only, not on the session length
+        """
+        finals = []
+        partial = None
+        for result in self.results.drain():
+            # Partials arrive deduplicated, a final replaces the pending partial
+            if result.kind == FINAL:
+                finals.append(result.text)
+                partial = ''
+            else:
+                partial = result.text
+        if finals:
+            self.update_text_display('\n'.join(finals))
+        if partial is not None:
+            self.update_partial_display(partial)
+
     def update_text_display(self, text):  
-        self.text_display.append(text)  
-        # Scroll to bottom  
+        # Follow new text only while the view is scrolled to the bottom
         scrollbar = self.text_display.verticalScrollBar()  
-        scrollbar.setValue(scrollbar.maximum())  
+        at_bottom = scrollbar.value() >= scrollbar.maximum()
+        self.text_display.appendPlainText(text)
+        if at_bottom:
+            scrollbar.setValue(scrollbar.maximum())  
     
+    def update_partial_display(self, text):
+        if text != self.partial_label.text():
+            self.partial_label.setText(text)
+
+    def update_stats(self):
+        snapshot = self.speech_recognizer.get_metrics()
+
+        def ms(name):
+            value = (snapshot.get(name) or {}).get('p95')
+            return f"{value * 1000:.1f} ms" if value is not None else '-'
+
+        self.stats_label.setText(
+            f"Callback p95 {ms('callback_seconds')} | "
+            f"Overflows {snapshot.get('input_overflows_total', 0)} | "
+            f"Queue {snapshot.get('audio_queue_depth', 0)} | "
+            f"Decode p95 {ms('accept_waveform_seconds')} | "
+            f"Dropped {snapshot.get('dropped_frames', 0)} frames | "
+            f"Lag {snapshot.get('decode_lag_seconds') or 0.0:.2f} s"
+            + (f" | Language {self.speech_recognizer.detected_language}"
+               if self.speech_recognizer.detected_language else '')
+        )
+
     def update_volume(self, volume):  
         self.mic_volume_bar.setValue(int(volume))  
     
@@ -202,10 +310,15 @@ class SpeechToTextApp(QMainWindow):
         error_box.setWindowTitle("Speech-to-Text Error")  
         error_box.exec_()  
 
-def main():  
+def main(started=None):  
+    """started: perf_counter() at process start, to report import time as a startup phase"""
     app = QApplication(sys.argv)  
     speech_to_text_app = SpeechToTextApp()  
     speech_to_text_app.show()  
+    if started is not None:
+        speech_to_text_app.speech_recognizer.record_startup_phase('window', time.perf_counter() - started)
+    # Slow startup work begins once the window is on screen
+    QTimer.singleShot(0, speech_to_text_app.start_initialization)
     sys.exit(app.exec_())  
 
 if __name__ == '__main__':  
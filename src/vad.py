@@ -0,0 +1,207 @@
+from collections import namedtuple, deque
+
+import numpy as np
+
+SPEECH_START = 'start'
+SPEECH_AUDIO = 'audio'
+SPEECH_END = 'end'
+
+# kind is one of SPEECH_START/SPEECH_AUDIO/SPEECH_END, sample is the position on the
+# detector's sample clock, audio is only set for SPEECH_AUDIO events
+VadEvent = namedtuple('VadEvent', ['kind', 'sample', 'audio'])
+
+
+class VoiceActivityDetector:
+    """
+    Base class for frame-level voice activity detectors
+    - Subclasses classify whole arrays of frames at once in classify()
+    - Handles framing across blocks, pre-roll, hangover, the maximum segment length and the sample clock
+    - Only speech (plus pre-roll and hangover) is returned as audio, in the input dtype
+    - Integer PCM is scaled into a reused float32 buffer for classification
+    """
+    def __init__(self, sample_rate, frame_ms=20, pre_roll_ms=300, hangover_ms=1000, max_segment_ms=30000):
+        self.sample_rate = sample_rate
+        self.frame_length = max(1, int(sample_rate * frame_ms / 1000))
+        self.pre_roll_frames = int(pre_roll_ms / frame_ms)
+        self.hangover_frames = max(1, int(hangover_ms / frame_ms))
+        # Longer segments are split, so a detector stuck in speech still produces finals
+        self.max_segment_samples = int(sample_rate * max_segment_ms / 1000) if max_segment_ms else None
+        self.reset()
+
+    def reset(self):
+        self.samples_processed = 0  # Monotonic sample clock, counts framed samples
+        self.in_speech = False
+        self.speech_start = None
+        self._silent_frames = 0
+        self._remainder = np.empty(0, dtype=np.float32)
+        self._pre_roll = np.empty(0, dtype=np.float32)
+        self._scratch = np.empty(0, dtype=np.float32)
+
+    def classify(self, frames):
+        """Return a boolean speech decision per row of frames (n_frames, frame_length)"""
+        raise NotImplementedError
+
+    @staticmethod
+    def to_mono(block):
+        if block.ndim == 1:
+            return block
+        if block.shape[1] == 1:
+            return block[:, 0]
+        return block.mean(axis=1).astype(block.dtype)
+
+    def to_float(self, frames):
+        if not np.issubdtype(frames.dtype, np.integer):
+            return frames
+        if self._scratch.size < frames.size:
+            self._scratch = np.empty(frames.size, dtype=np.float32)
+        scaled = self._scratch[:frames.size].reshape(frames.shape)
+        np.multiply(frames, 1.0 / -np.iinfo(frames.dtype).min, out=scaled, casting='unsafe')
+        return scaled
+
+    def process(self, block):
+        """Feed a block of audio and return the resulting VadEvents in order"""
+        samples = self.to_mono(block)
+        if self._remainder.size:
+            samples = np.concatenate((self._remainder, samples))
+        n_frames = len(samples) // self.frame_length
+        framed = n_frames * self.frame_length
+        self._remainder = samples[framed:].copy()
+        if n_frames == 0:
+            return []
+
+        frames = samples[:framed].reshape(n_frames, self.frame_length)
+        decisions = self.classify(self.to_float(frames))
+        base = self.samples_processed
+        self.samples_processed += framed
+
+        events = []
+        run_start = 0 if self.in_speech else None  # First frame of the current run of emitted audio
+        silence_start = 0  # First frame not yet emitted nor kept as pre-roll
+        for index, is_speech in enumerate(decisions):
+            if self.in_speech:
+                self._silent_frames = 0 if is_speech else self._silent_frames + 1
+                end = base + (index + 1) * self.frame_length
+                too_long = (self.max_segment_samples is not None
+                            and end - self.speech_start >= self.max_segment_samples)
+                if self._silent_frames >= self.hangover_frames or too_long:
+                    # Hangover expired or the segment is at its maximum length, close it after this frame
+                    events.append(VadEvent(SPEECH_AUDIO, base + run_start * self.frame_length,
+                                           frames[run_start:index + 1].reshape(-1)))
+                    events.append(VadEvent(SPEECH_END, end, None))
+                    run_start = None
+                    silence_start = index + 1
+                    self.in_speech = False
+            elif is_speech:
+                # Onset, replay the pre-roll so the first phoneme is not clipped
+                pre_roll = self._pre_roll_before(frames, silence_start, index)
+                self.in_speech = True
+                self._silent_frames = 0
+                self.speech_start = base + index * self.frame_length - len(pre_roll)
+                events.append(VadEvent(SPEECH_START, self.speech_start, None))
+                if len(pre_roll):
+                    events.append(VadEvent(SPEECH_AUDIO, self.speech_start, pre_roll))
+                self._pre_roll = np.empty(0, dtype=np.float32)
+                run_start = index
+
+        if run_start is not None:
+            events.append(VadEvent(SPEECH_AUDIO, base + run_start * self.frame_length,
+                                   frames[run_start:].reshape(-1)))
+        elif self.pre_roll_frames:
+            self._pre_roll = self._pre_roll_before(frames, silence_start, n_frames)
+        return events
+
+    def _pre_roll_before(self, frames, silence_start, index):
+        # Most recent non-speech audio preceding frame index, at most pre_roll_frames long
+        keep = self.pre_roll_frames * self.frame_length
+        if keep == 0:
+            return np.empty(0, dtype=np.float32)
+        tail = frames[max(silence_start, index - self.pre_roll_frames):index].reshape(-1)
+        if silence_start == 0 and len(tail) < keep and len(self._pre_roll):
+            tail = np.concatenate((self._pre_roll, tail))[-keep:]
+        return tail.copy()
+
+    def flush(self):
+        """Close an open segment, e.g. when capture stops"""
+        if not self.in_speech:
+            return []
+        self.in_speech = False
+        return [VadEvent(SPEECH_END, self.samples_processed, None)]
+
+
+class EnergySpectralVAD(VoiceActivityDetector):
+    """
+    Energy, zero-crossing and spectral-flatness detector
+    - Frames must rise margin_db above an adaptive noise floor
+    - Voiced frames are tonal (low flatness), unvoiced ones have a high zero-crossing rate
+    - The noise floor is the minimum frame energy over the last floor_window_ms, tracked on every
+      frame (minimum statistics), so steady noise becomes the floor even while it reads as speech
+    - Until a full window has been seen the floor is capped at initial_floor_rms, so speech at the
+      very start does not become the floor
+    """
+    def __init__(self, sample_rate, frame_ms=20, pre_roll_ms=300, hangover_ms=1000, max_segment_ms=30000,
+                 initial_floor_rms=0.005, min_rms=0.0005, margin_db=9.0,
+                 flatness_threshold=0.5, zcr_threshold=0.25, floor_window_ms=3000, floor_subwindows=6):
+        self.initial_floor_db = 20 * np.log10(max(initial_floor_rms, 1e-6))
+        self.min_energy_db = 20 * np.log10(max(min_rms, 1e-6))
+        self.margin_db = margin_db
+        self.flatness_threshold = flatness_threshold
+        self.zcr_threshold = zcr_threshold
+        self.floor_window_frames = max(1, int(floor_window_ms / frame_ms))
+        self.floor_subwindows = max(1, floor_subwindows)
+        self.subwindow_frames = max(1, self.floor_window_frames // self.floor_subwindows)
+        super().__init__(sample_rate, frame_ms, pre_roll_ms, hangover_ms, max_segment_ms)
+        self.window = np.hanning(self.frame_length).astype(np.float32)
+
+    def reset(self):
+        super().reset()
+        self.noise_floor_db = self.initial_floor_db
+        # Minima of the last complete sub-windows plus the one being filled
+        self._window_minima = deque(maxlen=self.floor_subwindows)
+        self._subwindow_min = np.inf
+        self._subwindow_count = 0
+        self._tracked_frames = 0
+
+    def track_floor(self, energy_db):
+        self._subwindow_min = min(self._subwindow_min, energy_db)
+        self._subwindow_count += 1
+        self._tracked_frames += 1
+        if self._subwindow_count >= self.subwindow_frames:
+            self._window_minima.append(self._subwindow_min)
+            self._subwindow_min = np.inf
+            self._subwindow_count = 0
+        floor = min(min(self._window_minima, default=np.inf), self._subwindow_min)
+        if self._tracked_frames < self.floor_window_frames:
+            floor = min(floor, self.initial_floor_db)
+        return max(floor, self.min_energy_db - self.margin_db)
+
+    def classify(self, frames):
+        energy_db = 10 * np.log10(np.mean(np.square(frames, dtype=np.float32), axis=1) + 1e-12)
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / self.frame_length
+        power = np.square(np.abs(np.fft.rfft(frames * self.window, axis=1))) + 1e-12
+        flatness = np.exp(np.mean(np.log(power), axis=1)) / np.mean(power, axis=1)
+
+        decisions = np.empty(len(frames), dtype=bool)
+        floor = self.noise_floor_db
+        for index in range(len(frames)):
+            floor = self.track_floor(energy_db[index])
+            loud = energy_db[index] > max(floor + self.margin_db, self.min_energy_db)
+            voiced = flatness[index] < self.flatness_threshold
+            unvoiced = zcr[index] > self.zcr_threshold
+            decisions[index] = loud and (voiced or unvoiced or energy_db[index] > floor + 2 * self.margin_db)
+        self.noise_floor_db = floor
+        return decisions
+
+
+VAD_ENGINES = {
+    'energy': EnergySpectralVAD,
+}
+
+
+def create_vad(engine, sample_rate, **options):
+    """Build a registered detector by name, options go to its constructor"""
+    try:
+        vad_class = VAD_ENGINES[engine]
+    except KeyError:
+        raise ValueError(f"Unknown VAD engine: {engine}")
+    return vad_class(sample_rate, **options)